@@ -18,15 +18,28 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 
-from .bases import PluggableList
+import os
+import sys
+from .bases import PluggableList, SortedPluggableList
+from .storage import ListStorage, ArrayStorage
 from .decorators import (
     get_callback, set_callback, remove_callback, sort_callback,
-    begin_operation_callback, end_operation_callback, revert_callback
+    begin_operation_callback, end_operation_callback, revert_callback,
+    get_many_callback, set_many_callback, remove_many_callback,
+    search_key_callback, sort_many_callback
 )
 
+if sys.version_info >= (3, 5):
+    from .asynchronous import AsyncPluggableList
+
+if sys.version_info >= (3, 8) and os.name == 'posix':
+    from .shared import SharedMemoryStorage
+
 
 __all___ = [
-    'PluggableList', 'get_callback', 'set_callback',
-    'remove_callback', 'sort_callback', 'begin_operation_callback',
-    'end_operation_callback', 'revert_callback',
+    'PluggableList', 'SortedPluggableList', 'ListStorage', 'ArrayStorage',
+    'get_callback', 'set_callback', 'remove_callback', 'sort_callback',
+    'begin_operation_callback', 'end_operation_callback', 'revert_callback',
+    'get_many_callback', 'set_many_callback', 'remove_many_callback',
+    'search_key_callback', 'sort_many_callback',
 ]
@@ -0,0 +1,322 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+a pluggable list whose callbacks may be coroutine functions. Requires
+Python 3.5 or later.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import asyncio
+import inspect
+from . import exceptions, control, constants, instrumentation
+from .bases import (
+    CallbackMixin, PluggableListMeta, get_list_attrs, instance_state,
+    normalise_index, restore_list
+)
+
+
+# hooks whose callbacks are invoked synchronously as an operation begins,
+# ends or is reverted, so cannot be coroutine functions
+SYNCHRONOUS_HOOKS = (
+    constants.Hook.begin_operation, constants.Hook.end_operation,
+    constants.Hook.revert,
+)
+
+
+async def _resolve(result):
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class AsyncPluggableListIter:
+    """
+    Asynchronous iterator over an AsyncPluggableList that fetches
+    `chunk_size` elements at a time, or all the elements at once if
+    `chunk_size` is None. If `chunk_size` is not 1 raises
+    `ModifiedDuringIteration` if the list is modified during iteration.
+    """
+    __slots__ = (
+        '_pl_obj', '_idx', '_chunk_size', '_chunk', '_ctl', '_data', '_version'
+    )
+
+    def __init__(self, pluggable_list, chunk_size=1):
+        self._pl_obj = pluggable_list
+        self._idx = 0
+        self._chunk_size = chunk_size
+        self._chunk = iter(())
+        self._ctl, self._data = get_list_attrs(pluggable_list)
+        self._version = self._ctl.version(pluggable_list)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunk)
+        except StopIteration:
+            pass
+
+        if (self._chunk_size != 1 and
+                self._ctl.version(self._pl_obj) != self._version):
+            raise exceptions.ModifiedDuringIteration()
+
+        start = self._idx
+        stop = len(self._data)
+
+        if start >= stop:
+            raise StopAsyncIteration()
+        elif self._chunk_size is not None:
+            stop = min(start + self._chunk_size, stop)
+
+        chunk = await self._pl_obj.get(slice(start, stop))
+
+        if not chunk:
+            raise StopAsyncIteration()
+
+        self._idx = start + len(chunk)
+        self._chunk = iter(chunk)
+        return next(self._chunk)
+
+
+class AsyncPluggableListMeta(PluggableListMeta):
+    """
+    Metaclass of asynchronous pluggable lists, which raises TypeError when a
+    class is created with a coroutine function as a begin_operation,
+    end_operation or revert callback.
+    """
+    def __new__(mcs, name, bases, attrs, **options):
+        new_cls = super().__new__(mcs, name, bases, attrs, **options)
+        ctl = getattr(new_cls, constants.CONTROL_ATTR)
+
+        for hook in SYNCHRONOUS_HOOKS:
+            if not ctl.has_callback(hook):
+                continue
+
+            callback_func = instrumentation.original_callback(
+                ctl.get_callback(hook)
+            )
+            if inspect.iscoroutinefunction(callback_func):
+                raise TypeError(
+                    '{} callback {!r} cannot be a coroutine function'
+                    .format(hook.name, callback_func.__name__)
+                )
+
+        return new_cls
+
+
+class AsyncPluggableList(CallbackMixin, metaclass=AsyncPluggableListMeta):
+    """
+    A pluggable list whose get, set and remove callbacks, and their batch
+    counterparts, may be coroutine functions. Elements are accessed and
+    modified with coroutine methods, and the list supports asynchronous
+    iteration.
+
+    Operations on a list run one at a time. Within a batch operation the
+    callback for each element is invoked concurrently, with at most
+    `async_concurrency` invocations in progress at once, and every
+    invocation finishes before any exception raised by one is propagated.
+    Begin operation, end operation and revert callbacks are invoked
+    synchronously and cannot be coroutine functions. The get_cache_size,
+    executor and snapshot_reads options do not apply.
+    """
+    __slots__ = constants.INSTANCE_ATTRS + ('__weakref__',)
+
+    def __init__(self):
+        ctl = getattr(self, constants.CONTROL_ATTR)
+        setattr(self, constants.DATA_ATTR, ctl.get_storage().create())
+
+    def _lock(self):
+        try:
+            return getattr(self, constants.LOCK_ATTR)
+        except AttributeError:
+            lock = asyncio.Lock()
+            setattr(self, constants.LOCK_ATTR, lock)
+            return lock
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle the list as the elements held by its storage, which are
+        restored directly when it is unpickled, so set callbacks are not
+        invoked again. Raises RuntimeError if a modifying operation is in
+        progress, as its changes may be incomplete.
+        """
+        ctl, data = get_list_attrs(self)
+
+        if ctl.in_op(self):
+            raise RuntimeError('cannot pickle a list while it is being modified')
+
+        state = ctl.get_storage().dump(data, protocol)
+        return (restore_list, (type(self), state), instance_state(self))
+
+    async def _invoke(self, hook, idx, value):
+        """
+        Invoke the callback for hook `hook`, or its batch hook, with `idx`
+        and `value`, returning the value it returns, or `value` if there is
+        no callback.
+        """
+        ctl, data = get_list_attrs(self)
+        batch_hook = constants.BATCH_HOOKS[hook]
+
+        if ctl.has_callback(hook):
+            return await _resolve(ctl.get_callback(hook)(
+                self, hook, control.ListProxy(data), idx, value
+            ))
+        elif ctl.has_callback(batch_hook):
+            result = await self._invoke_many(hook, (idx,), (value,))
+            return value if result is None else result[0]
+        else:
+            return value
+
+    async def _invoke_many(self, hook, indices, values):
+        """
+        Invoke the callback for the batch hook of hook `hook` with `indices`
+        and `values`, or the callback for hook `hook` for each of them
+        concurrently, returning a list of the values returned, or `values`
+        if there are no callbacks.
+        """
+        ctl, data = get_list_attrs(self)
+        proxy = control.ListProxy(data)
+        batch_hook = constants.BATCH_HOOKS[hook]
+
+        if ctl.has_callback(batch_hook):
+            result = await _resolve(ctl.get_callback(batch_hook)(
+                self, batch_hook, proxy, indices, values
+            ))
+            if hook == constants.Hook.remove:
+                return None
+            result = list(result)
+            if len(result) != len(values):
+                raise exceptions.IncorrectNumberOfValues(len(result))
+            return result
+        elif not ctl.has_callback(hook):
+            return list(values)
+
+        callback_func = ctl.get_callback(hook)
+        concurrency = ctl.get_option('async_concurrency')
+        semaphore = asyncio.Semaphore(concurrency or len(values) or 1)
+
+        async def invoke(idx, value):
+            async with semaphore:
+                return await _resolve(
+                    callback_func(self, hook, proxy, idx, value)
+                )
+
+        results = await asyncio.gather(
+            *[invoke(idx, value) for idx, value in zip(indices, values)],
+            return_exceptions=True
+        )
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        return results
+
+    def __len__(self):
+        return len(getattr(self, constants.DATA_ATTR))
+
+    def __aiter__(self):
+        return AsyncPluggableListIter(
+            self, getattr(self, constants.CONTROL_ATTR).get_option('iter_chunk_size')
+        )
+
+    def version(self):
+        """
+        Return the modification count of the list.
+        """
+        return getattr(self, constants.CONTROL_ATTR).version(self)
+
+    async def get(self, spec):
+        """
+        Return the element at index `spec`, or a list of the elements in the
+        slice `spec`.
+        """
+        ctl, data = get_list_attrs(self)
+
+        async with self._lock():
+            with ctl.op(self, fetch=True, safe=True):
+                if isinstance(spec, slice):
+                    indices = range(*spec.indices(len(data)))
+                    return await self._invoke_many(
+                        constants.Hook.get, indices, [data[idx] for idx in indices]
+                    )
+                return await self._invoke(constants.Hook.get, spec, data[spec])
+
+    async def set(self, idx, value):
+        """
+        Replace the element at index `idx` with `value`.
+        """
+        ctl, data = get_list_attrs(self)
+
+        async with self._lock():
+            with ctl.op(self, modify=True, safe=True):
+                journal = ctl.journal(self)
+                idx = normalise_index(idx, len(data))
+                await self._invoke(constants.Hook.remove, idx, data[idx])
+                journal.delete(idx)
+                value = await self._invoke(constants.Hook.set, idx, value)
+                journal.insert(idx, value)
+
+    async def append(self, value):
+        """
+        Add an item to the end of the list.
+        """
+        await self.extend((value,))
+
+    async def extend(self, iterable_obj):
+        """
+        Extend the list by appending all the values yield by `iterable_obj` to
+        the list.
+        """
+        ctl, data = get_list_attrs(self)
+        values = list(iterable_obj)
+
+        async with self._lock():
+            with ctl.op(self, modify=True, safe=True):
+                start = len(data)
+                values = await self._invoke_many(
+                    constants.Hook.set, range(start, start + len(values)), values
+                )
+                ctl.journal(self).extend(values)
+
+    async def insert(self, idx, value):
+        """
+        Insert `value` before index `idx`.
+        """
+        ctl, data = get_list_attrs(self)
+
+        async with self._lock():
+            with ctl.op(self, modify=True, safe=True):
+                idx = max(idx + len(data), 0) if idx < 0 else min(idx, len(data))
+                value = await self._invoke(constants.Hook.set, idx, value)
+                ctl.journal(self).insert(idx, value)
+
+    async def pop(self, idx=-1):
+        """
+        Remove the item at index `idx` and return it.
+        """
+        ctl, data = get_list_attrs(self)
+
+        async with self._lock():
+            with ctl.op(self, modify=True, fetch=True, safe=True):
+                idx = normalise_index(idx, len(data))
+                value = data[idx]
+                await self._invoke(constants.Hook.remove, idx, value)
+                ctl.journal(self).delete(idx)
+                return value
@@ -20,10 +20,19 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 
-from . import exceptions, control, constants
+import bisect
+import copy as copy_module
+import itertools
+from . import (
+    exceptions, control, constants, instrumentation, storage as storage_backends
+)
 from .utils import iter_tools
 
 
+# slots whose values are not pickled
+_RESERVED_SLOTS = constants.INSTANCE_ATTRS + ('__dict__', '__weakref__')
+
+
 def get_list_attrs(pl_obj):
     """
     Return the control and data objects for a pluggable list object.
@@ -34,12 +43,266 @@ def get_list_attrs(pl_obj):
     )
 
 
+def normalise_index(idx, length):
+    """
+    Return the non-negative index equivalent to the index `idx` of a list of
+    `length` elements. Raises IndexError if it is out of range.
+    """
+    if idx < 0:
+        idx += length
+
+    if not 0 <= idx < length:
+        raise IndexError('pluggable list index out of range')
+
+    return idx
+
+
+def remove_range(pl_obj, indices):
+    """
+    Remove the elements at the indices in the range `indices`, normalised as
+    by `slice.indices`, from the data of `pl_obj` as part of a modifying
+    operation. Remove callbacks are invoked as if the elements were removed
+    one at a time in the order of `indices`, then all the elements are
+    removed in a single step.
+    """
+    ctl, data = get_list_attrs(pl_obj)
+    remove_many = ctl.bind_many(pl_obj, constants.Hook.remove)
+
+    if remove_many is not None:
+        remove_indices = sorted(indices)
+        remove_many(remove_indices, [data[idx] for idx in remove_indices])
+    else:
+        proxy = control.DeletionProxy(data, indices)
+        remove = ctl.bind(pl_obj, constants.Hook.remove, proxy)
+
+        if remove is not None:
+            shifted_indices = iter_tools.del_indices(indices)
+            for idx, shifted_idx in zip(indices, shifted_indices):
+                remove(shifted_idx, data[idx])
+                proxy.removed += 1
+
+    ctl.journal(pl_obj).delete_range(indices)
+
+
+def get_range(pl_obj, indices, snapshot=None):
+    """
+    Return a list of the values at the indices in the range `indices`,
+    normalised as by `slice.indices`, of the data of `pl_obj`, as altered by
+    any get callbacks. Must be called in a fetching operation, unless
+    `snapshot`, a snapshot of the data returned by `Control.snapshot`, is
+    given, in which case the values are read from it.
+    """
+    ctl, data = get_list_attrs(pl_obj)
+    proxy = None
+
+    if snapshot is not None:
+        data = snapshot
+        proxy = control.ListProxy(snapshot)
+
+    get_many = ctl.bind_many(pl_obj, constants.Hook.get, proxy)
+    get = ctl.bind(pl_obj, constants.Hook.get, proxy)
+
+    if get_many is not None:
+        return get_many(indices, [data[idx] for idx in indices])
+    elif get is not None:
+        return [get(idx, data[idx]) for idx in indices]
+    else:
+        spec = slice(indices.start, indices.stop, indices.step)
+        if indices.stop < 0:
+            spec = slice(indices.start, None, indices.step)
+        if snapshot is not None:
+            return list(snapshot[spec])
+        return ctl.get_storage().as_list(data[spec])
+
+
+def iter_snapshot(pl_obj, snapshot):
+    """
+    Return an iterator over the values of `snapshot`, a snapshot of the data
+    of `pl_obj` returned by `Control.snapshot`, as altered by any get
+    callbacks, which are invoked as the iterator advances.
+    """
+    ctl = getattr(pl_obj, constants.CONTROL_ATTR)
+    get = ctl.bind(pl_obj, constants.Hook.get, control.ListProxy(snapshot))
+
+    if get is None:
+        return iter(snapshot)
+    else:
+        return itertools.starmap(get, enumerate(snapshot))
+
+
+def bind_sort_value(pl_obj):
+    """
+    Return a function that takes a value and its index and returns the value
+    to sort it by, or None if there are no sort callbacks. As in
+    `SortMixin.sort` the sort many callback of `pl_obj` is used if there is
+    one, and otherwise the sort callback.
+    """
+    ctl = getattr(pl_obj, constants.CONTROL_ATTR)
+    sort_many = ctl.bind_many(pl_obj, constants.Hook.sort)
+    sort_value = ctl.bind(pl_obj, constants.Hook.sort)
+
+    if sort_many is not None:
+        return lambda value, idx: sort_many((idx,), (value,))[0]
+    elif sort_value is not None:
+        return lambda value, idx: sort_value(value)
+    else:
+        return None
+
+
+def sort_keys(pl_obj, values):
+    """
+    Return a list of the values to sort each of the sequence `values` by,
+    found with a single invocation of the sort many callback of `pl_obj` if
+    there is one, or None if there are no sort callbacks.
+    """
+    ctl = getattr(pl_obj, constants.CONTROL_ATTR)
+    sort_many = ctl.bind_many(pl_obj, constants.Hook.sort)
+    sort_value = ctl.bind(pl_obj, constants.Hook.sort)
+
+    if sort_many is not None:
+        return sort_many(range(len(values)), values)
+    elif sort_value is not None:
+        return [sort_value(value) for value in values]
+    else:
+        return None
+
+
+def bisect_sorted(pl_obj, key, sort_value=None, right=False, data=None,
+                  low=0):
+    """
+    Return the index at which a value sorting by `key` would be inserted
+    into the sorted data of `pl_obj`, or into `data` if it is given, before
+    any equal elements or after them if `right` is true, searching from
+    index `low`. If `sort_value`, as returned by `bind_sort_value`, is given
+    elements are ordered by the values it returns; otherwise `key` is the
+    value itself.
+    """
+    if data is None:
+        data = getattr(pl_obj, constants.DATA_ATTR)
+
+    if sort_value is None:
+        if right:
+            return bisect.bisect_right(data, key, low)
+        else:
+            return bisect.bisect_left(data, key, low)
+
+    high = len(data)
+
+    while low < high:
+        mid = (low + high) // 2
+        mid_key = sort_value(data[mid], mid)
+
+        if right:
+            before = key < mid_key
+        else:
+            before = not mid_key < key
+
+        if before:
+            high = mid
+        else:
+            low = mid + 1
+
+    return low
+
+
+def find_sorted(pl_obj, value, data=None):
+    """
+    Return a sequence of the indices of the elements of the sorted data of
+    `pl_obj`, or of `data` if it is given, equal to `value`.
+    """
+    if data is None:
+        data = getattr(pl_obj, constants.DATA_ATTR)
+
+    sort_value = bind_sort_value(pl_obj)
+    key = value if sort_value is None else sort_value(value, 0)
+    start = bisect_sorted(pl_obj, key, sort_value, data=data)
+    stop = bisect_sorted(pl_obj, key, sort_value, right=True, data=data)
+
+    if sort_value is None:
+        return range(start, stop)
+
+    return [idx for idx in range(start, stop) if data[idx] == value]
+
+
+def find(pl_obj, value):
+    """
+    Return the index of the first element of the data of `pl_obj` equal to
+    `value`, or whose search key is equal to that of `value` if there is a
+    search key callback. Raises ValueError if there is no such element.
+    """
+    ctl, data = get_list_attrs(pl_obj)
+    value_index = ctl.get_index(pl_obj)
+    key = ctl.bind(pl_obj, constants.Hook.search_key)
+
+    if value_index is not None:
+        idx = value_index.first(value)
+        if idx is not None:
+            return idx
+    elif key is not None:
+        value = key(value)
+        for idx, in_value in enumerate(data):
+            if key(in_value) == value:
+                return idx
+    else:
+        try:
+            return data.index(value)
+        except ValueError:
+            pass
+
+    raise ValueError('pluggable_list.index(x): x not in list')
+
+
+def restore_list(list_cls, state):
+    """
+    Return a new instance of `list_cls` holding the sequence its storage
+    backend loads from `state`, an object returned by the `dump` method of
+    the backend, without invoking any callbacks. Used to unpickle lists.
+    """
+    ctl = getattr(list_cls, constants.CONTROL_ATTR)
+    pl_obj = list_cls.__new__(list_cls)
+    setattr(pl_obj, constants.DATA_ATTR, ctl.get_storage().load(state))
+    ctl.count_modification(pl_obj)
+    return pl_obj
+
+
+def instance_state(pl_obj):
+    """
+    Return the attributes subclasses have added to `pl_obj`, as the state
+    item of the value returned by `__reduce_ex__`, or None if there are
+    none. The attributes pluggable lists use themselves are left out.
+    """
+    slots = {}
+
+    for cls in type(pl_obj).__mro__:
+        names = vars(cls).get('__slots__', ())
+
+        for name in (names,) if isinstance(names, str) else names:
+            if name in _RESERVED_SLOTS:
+                continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_{}{}'.format(cls.__name__.lstrip('_'), name)
+            try:
+                slots[name] = getattr(pl_obj, name)
+            except AttributeError:
+                pass
+
+    attrs = getattr(pl_obj, '__dict__', None) or None
+
+    if slots:
+        return (attrs, slots)
+    return attrs
+
+
 class PluggableListIter:
+    __slots__ = ('_pl_obj', '_idx', '_stop', '_ctl', '_data', '_plain', '_get')
+
     def __init__(self, pluggable_list):
         self._pl_obj = pluggable_list
         self._idx = 0
         self._stop = False
         self._ctl, self._data = get_list_attrs(pluggable_list)
+        self._plain = self._ctl.is_plain(constants.Hook.get)
+        self._get = self._ctl.bind(pluggable_list, constants.Hook.get)
 
     def __iter__(self):
         return self
@@ -47,24 +310,147 @@ class PluggableListIter:
     def __next__(self):
         if self._stop:
             raise StopIteration()
+        elif self._plain:
+            try:
+                value = self._data[self._idx]
+            except IndexError:
+                self._stop = True
+                raise StopIteration()
+            else:
+                self._idx += 1
+                return value
         else:
-            with self._ctl.op(self._pl_obj, fetch=True, safe=True) as invoke:
+            with self._ctl.op(self._pl_obj, fetch=True, safe=True):
                 try:
                     value = self._data[self._idx]
                 except IndexError:
                     self._stop = True
                     raise StopIteration()
                 else:
-                    value = invoke(value)(constants.Hook.get, self._idx, value)
+                    if self._get is not None:
+                        value = self._get(self._idx, value)
                     self._idx += 1
                     return value
 
 
+class PluggableListChunkIter:
+    """
+    Iterator over a pluggable list that fetches `chunk_size` elements at a
+    time in a single operation, or all the elements in a single operation if
+    `chunk_size` is None. Raises `ModifiedDuringIteration` if the list is
+    modified during iteration.
+    """
+    __slots__ = (
+        '_pl_obj', '_idx', '_chunk_size', '_chunk', '_ctl', '_data', '_version'
+    )
+
+    def __init__(self, pluggable_list, chunk_size=None):
+        self._pl_obj = pluggable_list
+        self._idx = 0
+        self._chunk_size = chunk_size
+        self._chunk = iter(())
+        self._ctl, self._data = get_list_attrs(pluggable_list)
+        self._version = self._ctl.version(pluggable_list)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunk)
+        except StopIteration:
+            pass
+
+        if self._ctl.version(self._pl_obj) != self._version:
+            raise exceptions.ModifiedDuringIteration()
+
+        start = self._idx
+        stop = len(self._data)
+
+        if start >= stop:
+            raise StopIteration()
+        elif self._chunk_size is not None:
+            stop = min(start + self._chunk_size, stop)
+
+        with self._ctl.op(self._pl_obj, fetch=True, safe=True):
+            chunk = get_range(self._pl_obj, range(start, stop))
+
+        self._idx = stop
+        self._chunk = iter(chunk)
+        return next(self._chunk)
+
+
 class PluggableListMeta(type):
     """
-    Metaclass for pluggable list
+    Metaclass for pluggable list. Options for the class may be given as
+    keywords in the class definition, otherwise they are inherited. The
+    options are:
+
+    * `storage`: the storage backend that holds the elements of the list.
+      Operations on a list whose backend is shared between processes hold
+      a lock provided by the backend, and the get_cache_size, index_values
+      and snapshot_reads options, which keep state for each process, cannot
+      be used with it;
+    * `iter_chunk_size`: the number of elements an iterator fetches in each
+      operation, or None to fetch all elements in a single operation. If
+      this is not 1 iterators raise `ModifiedDuringIteration` if the list
+      is modified during iteration;
+    * `get_cache_size`: the maximum number of values returned by get
+      callbacks each list caches, or None to not cache them. Cached values
+      are discarded when the elements they were fetched from change
+      position or value;
+    * `index_values`: if true each list keeps an index of its values, which
+      must be hashable, so membership tests, count, index and remove do not
+      have to scan the list;
+    * `executor`: None, or 'thread' or 'process' to invoke get and set
+      callbacks for batch operations in parallel in a pool of threads or
+      processes shared by the lists of the class. Callbacks invoked in a
+      process are passed a new, empty instance of the class;
+    * `executor_workers`: the number of workers in the pool, or None for
+      the number of CPUs;
+    * `executor_chunk_size`: the number of elements each task passed to the
+      pool handles, or None to split each batch evenly between the workers;
+    * `async_concurrency`: the maximum number of callbacks an asynchronous
+      list invokes concurrently in a batch operation, or None for no limit;
+    * `thread_safe`: if true operations on a list hold a lock, shared by
+      operations that only fetch data and exclusive for operations that
+      modify it, so the list can be shared between threads;
+    * `snapshot_reads`: if true every modifying operation that succeeds
+      publishes an immutable snapshot of the list, and fetching elements,
+      iterating and membership tests read the latest snapshot without
+      taking a lock or running an operation, so no begin or end operation
+      callbacks are invoked for them and the get cache is not used.
+      Operations hold a lock as if `thread_safe` were true, so modifying
+      operations in different threads run one at a time. Each published
+      snapshot is a complete copy of the list, so every modifying operation
+      that succeeds takes time and memory proportional to the length of the
+      list, however few elements it changes; this suits lists that are read
+      far more often than they are modified;
+    * `instrument`: if true the class records the latencies of its
+      callbacks and of the public methods of its lists, the bytes journals
+      save to be able to undo changes and the rollbacks performed, which
+      are returned by the stats method of its Control object. Otherwise
+      nothing is recorded and nothing is timed.
     """
-    def __new__(mcs, name, bases, attrs):
+    default_options = {
+        'storage': storage_backends.ListStorage(),
+        'iter_chunk_size': 1,
+        'get_cache_size': None,
+        'index_values': False,
+        'executor': None,
+        'executor_workers': None,
+        'executor_chunk_size': None,
+        'async_concurrency': 16,
+        'thread_safe': False,
+        'snapshot_reads': False,
+        'instrument': False,
+    }
+
+    def __new__(mcs, name, bases, attrs, **options):
+        for option in options:
+            if option not in mcs.default_options:
+                raise TypeError('unknown option {!r}'.format(option))
+
         callbacks = {}
 
         for _, attr, register in iter_tools.attrs_with_a_register(attrs):
@@ -79,8 +465,9 @@ class PluggableListMeta(type):
         bases_iter = iter(bases)
 
         unseen_hooks = set(constants.Hook).difference(callbacks)
+        unseen_options = set(mcs.default_options).difference(options)
 
-        while unseen_hooks:
+        while unseen_hooks or unseen_options:
             try:
                 base = next(bases_iter)
             except StopIteration:
@@ -101,15 +488,40 @@ class PluggableListMeta(type):
 
                 unseen_hooks -= found
 
+                for option in unseen_options:
+                    options[option] = ctl.get_option(option)
+
+                unseen_options.clear()
+
+        for option in unseen_options:
+            options[option] = mcs.default_options[option]
+
+        if options['executor'] not in (None, 'thread', 'process'):
+            raise ValueError('unknown executor {!r}'.format(options['executor']))
+
+        if options['storage'].shared:
+            for option in ('get_cache_size', 'index_values', 'snapshot_reads'):
+                if options[option]:
+                    raise ValueError(
+                        'option {!r} cannot be used with storage shared between '
+                        'processes'.format(option)
+                    )
+
         new_cls = type.__new__(mcs, name, bases, attrs)
-        ctl = control.Control(new_cls, callbacks)
+        ctl = control.Control(new_cls, callbacks, options)
         setattr(new_cls, constants.CONTROL_ATTR, ctl)
 
+        if options['instrument']:
+            instrumentation.instrument_class(new_cls)
+
         return new_cls
 
+    def __init__(cls, name, bases, attrs, **options):
+        super().__init__(name, bases, attrs)
+
 
 class CallbackMixin(metaclass=PluggableListMeta):
-    pass
+    __slots__ = ()
 
 
 class BasePluggableList(CallbackMixin):
@@ -117,39 +529,142 @@ class BasePluggableList(CallbackMixin):
     A base class for a class that implements a list like structure.
     Only the __getitem__, __iter__ and copy methods are implemented
     in this base class.
+
+    Instances hold their state in slots rather than a `__dict__`, as do
+    those of the mixins and pluggable list classes in this module. A
+    subclass that does not define `__slots__` has a `__dict__` as usual;
+    one that defines `__slots__`, even if empty, keeps its instances
+    compact.
     """
+    __slots__ = constants.INSTANCE_ATTRS + ('__weakref__',)
+
     def __init__(self, iterable_obj=None):
-        data = []
+        ctl = getattr(self, constants.CONTROL_ATTR)
+
+        if iterable_obj is not None and ctl.is_plain(constants.Hook.set):
+            # nothing can observe or refuse the values, so the storage is
+            # created holding them, sized exactly for small lists
+            data = ctl.get_storage().create(iterable_obj)
+            setattr(self, constants.DATA_ATTR, data)
+            ctl.count_modification(self)
+            return
+
+        data = ctl.get_storage().create()
         setattr(self, constants.DATA_ATTR, data)
 
         if iterable_obj is not None:
-            with getattr(self, constants.CONTROL_ATTR).op(
-                self, modify=True, safe=True
-            ) as invoke:
-                for idx, value in enumerate(iterable_obj):
-                    data.append(invoke(value)(constants.Hook.set, idx, value))
+            with ctl.op(self, modify=True, safe=True):
+                journal = ctl.journal(self)
+                set_many = ctl.bind_many(self, constants.Hook.set)
+                set_value = ctl.bind(self, constants.Hook.set)
+
+                if set_many is not None:
+                    values = list(iterable_obj)
+                    journal.extend(set_many(range(len(values)), values))
+                elif set_value is None:
+                    journal.extend(iterable_obj)
+                else:
+                    for idx, value in enumerate(iterable_obj):
+                        journal.append(set_value(idx, value))
+
+    def transaction(self):
+        """
+        Return a context manager that runs all the operations made on the
+        list inside it as a single modifying operation. Begin and end
+        operation callbacks are invoked once, and if an exception is raised
+        all changes made inside the context are reverted.
+        """
+        ctl = getattr(self, constants.CONTROL_ATTR)
+        return ctl.op(self, modify=True, fetch=True)
+
+    def version(self):
+        """
+        Return the modification count of the list. The count increases
+        whenever the list is modified, and is restored when a failed
+        operation is reverted.
+        """
+        return getattr(self, constants.CONTROL_ATTR).version(self)
+
+    def cache_stats(self):
+        """
+        Return a dictionary of the number of hits, misses and evictions of
+        the cache of values returned by get callbacks, and its size and
+        capacity, or None if the list does not cache them.
+        """
+        get_cache = getattr(self, constants.CONTROL_ATTR).get_cache(self)
+        return None if get_cache is None else get_cache.stats()
 
     def copy(self):
         """
-        Return a shallow copy of the pluggable list
+        Return a shallow copy of the pluggable list. No callbacks are invoked
+        for the elements of the copy.
+        """
+        return copy_module.copy(self)
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickle the list as the elements held by its storage, which are
+        restored directly when it is unpickled, so set callbacks are not
+        invoked again. Storage backends holding arrays pass their elements
+        as out-of-band buffers with pickle protocol 5. The buffer holds a
+        copy of the elements, taken while the list is read, so the list can
+        change size while a consumer holds it. Unpickling copies the buffer
+        again, into a new array, so an out-of-band pickle costs two copies
+        of the elements rather than none.
         """
-        return getattr(self, constants.CONTROL_ATTR).create_copy(self)
+        ctl = getattr(self, constants.CONTROL_ATTR)
+
+        with ctl.op(self, fetch=True):
+            state = ctl.get_storage().dump(
+                getattr(self, constants.DATA_ATTR), protocol
+            )
+
+        return (restore_list, (type(self), state), instance_state(self))
 
     def __getitem__(self, spec):
         ctl, data = get_list_attrs(self)
+        snapshot = ctl.snapshot(self)
+
+        if snapshot is not None:
+            if isinstance(spec, slice):
+                return get_range(
+                    self, range(*spec.indices(len(snapshot))), snapshot
+                )
+
+            get = ctl.bind(self, constants.Hook.get, control.ListProxy(snapshot))
 
-        with ctl.op(self, fetch=True, safe=True) as invoke:
-            def get(idx):
-                value = data[idx]
-                return invoke(value)(constants.Hook.get, idx, value)
+            if get is None:
+                return snapshot[spec]
+            else:
+                return get(spec, snapshot[spec])
+
+        if ctl.is_plain(constants.Hook.get):
+            if isinstance(spec, slice):
+                return ctl.get_storage().as_list(data[spec])
+            return data[spec]
 
+        with ctl.op(self, fetch=True, safe=True):
             if isinstance(spec, slice):
-                return [get(idx) for idx in range(*spec.indices(len(data)))]
+                return get_range(self, range(*spec.indices(len(data))))
+
+            get = ctl.bind(self, constants.Hook.get)
+
+            if get is None:
+                return data[spec]
             else:
-                return get(spec)
+                return get(spec, data[spec])
 
     def __iter__(self):
-        return PluggableListIter(self)
+        ctl = getattr(self, constants.CONTROL_ATTR)
+        snapshot = ctl.snapshot(self)
+        chunk_size = ctl.get_option('iter_chunk_size')
+
+        if snapshot is not None:
+            return iter_snapshot(self, snapshot)
+        elif chunk_size == 1:
+            return PluggableListIter(self)
+        else:
+            return PluggableListChunkIter(self, chunk_size)
 
     def __eq__(self, other):
         return (
@@ -159,22 +674,44 @@ class BasePluggableList(CallbackMixin):
 
     def __contains__(self, value):
         ctl, data = get_list_attrs(self)
+        snapshot = ctl.snapshot(self)
+
+        if snapshot is not None:
+            key = ctl.bind(
+                self, constants.Hook.search_key, control.ListProxy(snapshot)
+            )
 
-        with ctl.op(self, fetch=True) as invoke:
-            if ctl.has_callback(constants.Hook.search):
-                return any(invoke(constants.Hook.search, v, value) for v in data)
+            if key is not None:
+                value = key(value)
+                return any(key(v) == value for v in snapshot)
             else:
-                return any(v == value for v in data)
+                return value in snapshot
+
+        with ctl.op(self, fetch=True):
+            value_index = ctl.get_index(self)
+            key = ctl.bind(self, constants.Hook.search_key)
+
+            if value_index is not None:
+                return value_index.count(value) > 0
+            elif key is not None:
+                value = key(value)
+                return any(key(v) == value for v in data)
+            else:
+                return value in data
 
 
 class SetItemMixin:
     """
     Mixin that provides the __setitem__ method.
     """
+    __slots__ = ()
+
     def __setitem__(self, spec, value):
         ctl, data = get_list_attrs(self)
 
-        with ctl.op(self, modify=True, safe=True) as invoke:
+        with ctl.op(self, modify=True, safe=True):
+            journal = ctl.journal(self)
+
             if isinstance(spec, slice):
                 try:
                     iter(value)
@@ -182,7 +719,7 @@ class SetItemMixin:
                     raise TypeError('can only assign an iterable')
 
                 initial_len = len(data)
-                indices = tuple(range(*spec.indices(initial_len)))
+                indices = range(*spec.indices(initial_len))
 
                 strict_value_count = None
 
@@ -202,9 +739,7 @@ class SetItemMixin:
                             # value is an empty sequence, nothing more to do.
                             return None
 
-                for idx in iter_tools.del_indices(indices):
-                    invoke(None)(constants.Hook.remove, idx, data[idx])
-                    del data[idx]
+                remove_range(self, indices)
 
                 if spec.step is None or spec.step > 0:
                     if spec.start is None:
@@ -229,35 +764,65 @@ class SetItemMixin:
                 )
 
                 try:
-                    for idx, value_to_set in pair_iter:
-                        data.insert(
-                            idx,
-                            invoke(value_to_set)(constants.Hook.set, idx, value_to_set)
-                        )
+                    pairs = list(pair_iter)
                 except exceptions.IncorrectNumberOfValues as exp:
                     raise ValueError(
                         'attempt to assign sequence of size {} to '
                         'extended slice of size {}'
                         .format(exp.count, strict_value_count)
                     )
+
+                set_indices = [idx for idx, _ in pairs]
+                values_to_set = [value_to_set for _, value_to_set in pairs]
+                set_many = ctl.bind_many(self, constants.Hook.set)
+
+                if set_many is not None:
+                    values_to_set = set_many(set_indices, values_to_set)
+                else:
+                    proxy = control.InsertionProxy(
+                        data, set_indices, values_to_set
+                    )
+                    set_value = ctl.bind(self, constants.Hook.set, proxy)
+
+                    if set_value is not None:
+                        for count, idx in enumerate(set_indices):
+                            values_to_set[count] = set_value(
+                                idx, values_to_set[count]
+                            )
+                            proxy.inserted += 1
+
+                if spec.step is None:
+                    indices = range(start, start + len(values_to_set))
+
+                journal.insert_range(indices, values_to_set)
             else:
-                idx = len(data) + spec if spec < 0 else spec
-                invoke(None)(constants.Hook.remove, idx, data[idx])
-                del data[idx]
-                data.insert(idx, invoke(value)(constants.Hook.set, idx, value))
+                idx = normalise_index(spec, len(data))
+                remove = ctl.bind(self, constants.Hook.remove)
+                if remove is not None:
+                    remove(idx, data[idx])
+                journal.delete(idx)
+                set_value = ctl.bind(self, constants.Hook.set)
+                if set_value is not None:
+                    value = set_value(idx, value)
+                journal.insert(idx, value)
 
 
 class AppendMixin:
     """
     Mixin that provides append and extend methods
     """
+    __slots__ = ()
+
     def append(self, value):
         """
         Add an item to the end of the list.
         """
         ctl, data = get_list_attrs(self)
-        with ctl.op(self, modify=True, safe=True) as invoke:
-            data.append(invoke(value)(constants.Hook.set, len(data), value))
+        with ctl.op(self, modify=True, safe=True):
+            set_value = ctl.bind(self, constants.Hook.set)
+            if set_value is not None:
+                value = set_value(len(data), value)
+            ctl.journal(self).append(value)
 
 
     def extend(self, iterable_obj):
@@ -266,43 +831,67 @@ class AppendMixin:
         the list.
         """
         ctl, data = get_list_attrs(self)
-        with ctl.op(self, safe=True, modify=True) as invoke:
-            for idx, value in enumerate(iterable_obj, start=len(data)):
-                data.append(invoke(value)(constants.Hook.set, idx, value))
+        with ctl.op(self, safe=True, modify=True):
+            journal = ctl.journal(self)
+            set_many = ctl.bind_many(self, constants.Hook.set)
+            set_value = ctl.bind(self, constants.Hook.set)
+
+            if set_many is not None:
+                values = list(iterable_obj)
+                indices = range(len(data), len(data) + len(values))
+                journal.extend(set_many(indices, values))
+            elif set_value is None:
+                journal.extend(iterable_obj)
+            else:
+                for idx, value in enumerate(iterable_obj, start=len(data)):
+                    journal.append(set_value(idx, value))
 
 
 class InsertMixin(AppendMixin):
     """
     Mixin that provides insert, append and extend methods
     """
+    __slots__ = ()
+
     def insert(self, idx, value):
         """
         Insert `value` at a given position. The first argument is the
         index of the element before which to insert. Calls `_insert` internally.
         """
         ctl, data = get_list_attrs(self)
-        with ctl.op(self, modify=True, safe=True) as invoke:
+        with ctl.op(self, modify=True, safe=True):
             idx = max(idx + len(data), 0) if idx < 0 else min(idx, len(data))
-            data.insert(idx, invoke(value)(constants.Hook.set, idx, value))
+            set_value = ctl.bind(self, constants.Hook.set)
+            if set_value is not None:
+                value = set_value(idx, value)
+            ctl.journal(self).insert(idx, value)
 
 
 class SetMixin(InsertMixin, SetItemMixin):
     """
     Mixin that provides all set methods
     """
-    pass
+    __slots__ = ()
 
 
 class ClearMixin:
     """
     Implements the clear method.
     """
+    __slots__ = ()
+
     def clear(self):
+        """
+        Remove all items from the list.
+        """
         ctl, data = get_list_attrs(self)
-        with ctl.op(self, modify=True, safe=True) as invoke:
-            while data:
-                invoke(None)(constants.Hook.remove, 0, data[0])
-                del data[0]
+
+        if ctl.is_plain(constants.Hook.remove) and not ctl.in_op(self):
+            del data[:]
+            ctl.count_modification(self)
+        else:
+            with ctl.op(self, modify=True, safe=True):
+                remove_range(self, range(len(data)))
 
 
 class DelMixin(ClearMixin):
@@ -310,6 +899,8 @@ class DelMixin(ClearMixin):
     Mixin that implements puplic element removal methods that remove elements
     using indices (and not value searching).
     """
+    __slots__ = ()
+
     def pop(self, idx=None):
         """
         Remove the operation at the given position in the list and return it.
@@ -317,75 +908,77 @@ class DelMixin(ClearMixin):
         the list.
         """
         ctl, data = get_list_attrs(self)
-        with ctl.op(self, modify=True, fetch=True, safe=True) as invoke:
-            idx = len(data) if idx is None else idx
+        with ctl.op(self, modify=True, fetch=True, safe=True):
+            idx = normalise_index(-1 if idx is None else idx, len(data))
             value = data[idx]
-            value = invoke(value)(constants.Hook.remove, idx, value)
-            del data[idx]
+            remove = ctl.bind(self, constants.Hook.remove)
+            if remove is not None:
+                remove(idx, value)
+            ctl.journal(self).delete(idx)
+            return value
 
     def __delitem__(self, spec):
         ctl, data = get_list_attrs(self)
 
-        with ctl.op(self, modify=True, safe=True) as invoke:
+        with ctl.op(self, modify=True, safe=True):
             if isinstance(spec, slice):
-                indices = tuple(range(*spec.indices(len(data))))
-
-                for idx in iter_tools.del_indices(indices):
-                    invoke(None)(constants.Hook.remove, idx, data[idx])
-                    del data[idx]
+                remove_range(self, range(*spec.indices(len(data))))
             else:
-                idx = len(data) + spec if spec < 0 else spec
-                invoke(None)(constants.Hook.remove, idx, data[idx])
-                del data[idx]
+                idx = normalise_index(spec, len(data))
+                remove = ctl.bind(self, constants.Hook.remove)
+                if remove is not None:
+                    remove(idx, data[idx])
+                ctl.journal(self).delete(idx)
 
 
 class CountMixin:
     """
     Implements a count method.
     """
+    __slots__ = ()
+
     def count(self, value):
         """
         Return the number of times x appears in the list.
         """
         ctl, data = get_list_attrs(self)
 
-        with ctl.op(self, fetch=True) as invoke:
-            if ctl.has_callback(constants.Hook.search):
-                return sum(1 for v in data if invoke(constants.Hook.search, v, value))
+        with ctl.op(self, fetch=True):
+            value_index = ctl.get_index(self)
+            key = ctl.bind(self, constants.Hook.search_key)
+
+            if value_index is not None:
+                return value_index.count(value)
+            elif key is not None:
+                value = key(value)
+                return sum(1 for v in data if key(v) == value)
             else:
-                return sum(1 for v in data if v == value)
+                return data.count(value)
 
 
 class IndexMixin:
     """
     Implements the index method.
     """
+    __slots__ = ()
+
     def index(self, value):
         """
         Return the index in the list of the first item whose value is x. It is
         an error if there is no such item.
         """
-        ctl, data = get_list_attrs(self)
+        ctl = getattr(self, constants.CONTROL_ATTR)
 
-        with ctl.op(self, fetch=True) as invoke:
-            if ctl.has_callback(constants.Hook.search):
-                for idx, in_value in enumerate(data):
-                    if invoke(constants.Hook.search, in_value, value):
-                        return idx
-                else:
-                    raise ValueError('pluggable_list.index(x): x not in list')
-            else:
-                for idx, in_value in enumerate(data):
-                    if in_value == value:
-                        return idx
-                else:
-                    raise ValueError('pluggable_list.index(x): x not in list')
+        with ctl.op(self, fetch=True):
+            return find(self, value)
 
 
 class RemoveMixin:
     """
     Implements the remove method.
     """
+    __slots__ = ()
+
     def remove(self, ex_value):
         """
         Remove the first item from the list whose value is x. It is an error
@@ -393,69 +986,213 @@ class RemoveMixin:
         """
         ctl, data = get_list_attrs(self)
 
-        with ctl.op(self, fetch=True) as invoke:
-            if ctl.has_callback(constants.Hook.search):
-                for idx, in_value in enumerate(data):
-                    if invoke(constants.Hook.search, in_value, ex_value):
-                        break
-                else:
-                    raise ValueError('pluggable_list.index(x): x not in list')
-            else:
-                for idx, in_value in enumerate(data):
-                    if invoke(constants.Hook.search, in_value, ex_value):
-                        break
-                else:
-                    raise ValueError('pluggable_list.index(x): x not in list')
-
-            try:
-                invoke(constants.Hook.remove, idx, in_value)
-            except exceptions.CallbackDoesNotExist:
-                pass
-
-            del data[idx]
+        with ctl.op(self, modify=True, fetch=True):
+            idx = find(self, ex_value)
+            remove = ctl.bind(self, constants.Hook.remove)
+            if remove is not None:
+                remove(idx, data[idx])
+            ctl.journal(self).delete(idx)
 
 
 class SearchMixin(RemoveMixin, IndexMixin, CountMixin):
     """
     Implements the remove, index and count methods
     """
+    __slots__ = ()
 
 
 class ReverseMixin:
     """
     Implements the reverse method.
     """
+    __slots__ = ()
+
     def reverse(self):
         """
         Reverse the elements of the list in place.
         """
-        getattr(self, constants.DATA_ATTR).reverse()
+        ctl = getattr(self, constants.CONTROL_ATTR)
+        with ctl.op(self, modify=True):
+            ctl.journal(self).reverse()
 
 
 class SortMixin(ReverseMixin):
     """
     Implements the sort and reverse methods.
     """
+    __slots__ = ()
+
     def sort(self, key=None, reverse=False):
         """
-        Sort the items of the list in place
+        Sort the items of the list in place. If there is a sort callback the
+        items are sorted by the values it returns, which are passed to `key`
+        if it is given. The sort callback is invoked once per item.
         """
-        def wrapper(func):
-            def wrapped(value):
-                value = getattr(self, constants.CONTROL_ATTR).sort_value(self, value)
-                return func(value)
-            return wrapped
+        ctl, data = get_list_attrs(self)
 
-        if key:
-            key = wrapper(key)
-        else:
-            key = lambda v: getattr(self, constants.CONTROL_ATTR).sort_value(self, v)
+        with ctl.op(self, modify=True):
+            if bind_sort_value(self) is None:
+                values = data[:]
+                ctl.get_storage().sort(values, key=key, reverse=reverse)
+            else:
+                values = ctl.get_storage().as_list(data[:])
+                keys = sort_keys(self, values)
 
-        getattr(self, constants.DATA_ATTR).sort(key=key, reverse=reverse)
+                if key is not None:
+                    keys = [key(sort_key) for sort_key in keys]
+
+                order = sorted(
+                    range(len(values)), key=keys.__getitem__, reverse=reverse
+                )
+                values = [values[idx] for idx in order]
+
+            ctl.journal(self).reorder(values)
 
 
 class PluggableList(BasePluggableList, SetMixin, DelMixin, SearchMixin, SortMixin):
     """
     Implements the BasePluggableList and all mixins
     """
-    pass
+    __slots__ = ()
+
+
+class SortedPluggableList(BasePluggableList, DelMixin):
+    """
+    A pluggable list that keeps its elements in sorted order, ordered by the
+    values returned by the sort many or sort callback if there is one.
+    Elements are added with the add and update methods, which find where to
+    insert them using binary search, and searching the list is done by
+    binary search too. A sort many callback is passed the indices of
+    elements of the list, and for values being added, index 0 or their
+    position in the batch passed to update.
+
+    Set and remove callbacks are invoked with the indices elements are
+    inserted at and removed from. A set callback must not change where the
+    value it is passed sorts.
+    """
+    __slots__ = ()
+
+    def __init__(self, iterable_obj=None):
+        super().__init__()
+
+        if iterable_obj is not None:
+            self.update(iterable_obj)
+
+    def add(self, value):
+        """
+        Insert `value` into the list after any equal elements.
+        """
+        ctl = getattr(self, constants.CONTROL_ATTR)
+
+        with ctl.op(self, modify=True, fetch=True, safe=True):
+            sort_value = bind_sort_value(self)
+            key = value if sort_value is None else sort_value(value, 0)
+            idx = bisect_sorted(self, key, sort_value, right=True)
+            set_value = ctl.bind(self, constants.Hook.set)
+            if set_value is not None:
+                value = set_value(idx, value)
+            ctl.journal(self).insert(idx, value)
+
+    def update(self, iterable_obj):
+        """
+        Insert all the values yielded by `iterable_obj` into the list, each
+        after any equal elements. The values are sorted as a batch and merged
+        into the list in a single step.
+        """
+        ctl, data = get_list_attrs(self)
+
+        with ctl.op(self, modify=True, fetch=True, safe=True):
+            values = list(iterable_obj)
+            keys = sort_keys(self, values)
+
+            if keys is None:
+                values.sort()
+                keys = values
+            else:
+                order = sorted(range(len(values)), key=keys.__getitem__)
+                values = [values[idx] for idx in order]
+                keys = [keys[idx] for idx in order]
+
+            # each value goes after the elements sorting no later than it and
+            # after the values of the batch before it, so the indices ascend
+            sort_value = bind_sort_value(self)
+            indices = []
+            low = 0
+            for count, key in enumerate(keys):
+                low = bisect_sorted(self, key, sort_value, right=True, low=low)
+                indices.append(low + count)
+
+            set_many = ctl.bind_many(self, constants.Hook.set)
+
+            if set_many is not None:
+                values = set_many(indices, values)
+            else:
+                proxy = control.InsertionProxy(data, indices, values)
+                set_value = ctl.bind(self, constants.Hook.set, proxy)
+
+                if set_value is not None:
+                    for count, idx in enumerate(indices):
+                        values[count] = set_value(idx, values[count])
+                        proxy.inserted += 1
+
+            if not values:
+                return
+
+            # merge the values with the elements after the first of them
+            start = indices[0]
+            kept = iter(ctl.get_storage().as_list(data[start:]))
+            inserted = iter(values)
+            index_set = set(indices)
+            merged = [
+                next(inserted) if idx in index_set else next(kept)
+                for idx in range(start, len(data) + len(values))
+            ]
+
+            journal = ctl.journal(self)
+            journal.delete_range(range(start, len(data)))
+            journal.insert_range(range(start, start + len(merged)), merged)
+
+    def __contains__(self, value):
+        ctl = getattr(self, constants.CONTROL_ATTR)
+        snapshot = ctl.snapshot(self)
+
+        if snapshot is not None:
+            return len(find_sorted(self, value, snapshot)) > 0
+
+        with ctl.op(self, fetch=True):
+            return len(find_sorted(self, value)) > 0
+
+    def count(self, value):
+        """
+        Return the number of times x appears in the list.
+        """
+        ctl = getattr(self, constants.CONTROL_ATTR)
+
+        with ctl.op(self, fetch=True):
+            return len(find_sorted(self, value))
+
+    def index(self, value):
+        """
+        Return the index in the list of the first item whose value is x. It is
+        an error if there is no such item.
+        """
+        ctl = getattr(self, constants.CONTROL_ATTR)
+
+        with ctl.op(self, fetch=True):
+            for idx in find_sorted(self, value):
+                return idx
+            raise ValueError('pluggable_list.index(x): x not in list')
+
+    def remove(self, ex_value):
+        """
+        Remove the first item from the list whose value is x. It is an error
+        if there is no such item.
+        """
+        ctl, data = get_list_attrs(self)
+
+        with ctl.op(self, modify=True, fetch=True):
+            idx = self.index(ex_value)
+            remove = ctl.bind(self, constants.Hook.remove)
+            if remove is not None:
+                remove(idx, data[idx])
+            ctl.journal(self).delete(idx)
@@ -0,0 +1,336 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+a benchmark suite that times the public methods of pluggable lists with
+different callbacks against the built-in list. Run it with
+
+    python -m pluggable_list.bench --help
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import collections
+import json
+import sys
+import time
+from . import constants, decorators
+from .bases import PluggableList
+
+
+HOOKS = (
+    'get', 'set', 'remove', 'sort', 'begin_operation', 'end_operation', 'revert'
+)
+SIZES = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+
+# option combinations benchmarked without callbacks, keyed by label; with
+# snapshot_reads every modifying operation copies the list to publish a
+# snapshot, which the benchmarks that modify the list measure
+OPTION_SETS = collections.OrderedDict([
+    ('snapshot', {'snapshot_reads': True}),
+])
+
+# the number of times a benchmark repeats an operation that handles a single
+# element, or fewer for smaller lists
+ELEMENT_OPS = 100
+
+
+def make_list_class(hooks, options=None):
+    """
+    Return a PluggableList subclass with a callback that changes nothing
+    for each hook named in `hooks`, created with the class options in the
+    dictionary `options` if it is given.
+    """
+    attrs = {'__slots__': ()}
+
+    for hook in hooks:
+        def callback(self, hook, proxy, *args, **kwargs):
+            return args[-1] if args else None
+        decorator = getattr(decorators, '{}_callback'.format(hook))
+        attrs['{}_cb'.format(hook)] = decorator()(callback)
+
+    name = 'BenchList_{}'.format('_'.join(hooks) or 'plain')
+    return type(PluggableList)(name, (PluggableList,), attrs, **(options or {}))
+
+
+def hook_sets(names=None):
+    """
+    Return a dictionary of the hook combinations benchmarked keyed by
+    label: no hooks, each hook on its own, all hooks and no hooks with each
+    of the option combinations in `OPTION_SETS`, or only those whose labels
+    are in `names` if it is given.
+    """
+    combos = collections.OrderedDict([('none', ())])
+    combos.update((hook, (hook,)) for hook in HOOKS)
+    combos['all'] = HOOKS
+    combos.update((label, ()) for label in OPTION_SETS)
+
+    if names is not None:
+        combos = collections.OrderedDict((name, combos[name]) for name in names)
+
+    return combos
+
+
+def _ops(size):
+    return min(ELEMENT_OPS, size)
+
+
+def _repeat(func):
+    def benchmark(obj, size):
+        for idx in range(_ops(size)):
+            func(obj, size, idx)
+    benchmark.per_element = True
+    return benchmark
+
+
+def _once(func):
+    def benchmark(obj, size):
+        func(obj, size)
+    benchmark.per_element = False
+    return benchmark
+
+
+# the benchmarks, as (name, function, modifies) triples; a function takes a
+# list and its size and performs the operation measured
+_BENCHMARKS = [
+    ('getitem', _repeat(lambda obj, size, idx: obj[idx * (size // _ops(size))]),
+     False),
+    ('getitem_slice', _once(lambda obj, size: obj[:]), False),
+    ('iterate', _once(lambda obj, size: [None for _ in obj]), False),
+    ('contains', _once(lambda obj, size: -1 in obj), False),
+    ('count', _once(lambda obj, size: obj.count(-1)), False),
+    ('index', _once(lambda obj, size: obj.index(size - 1)), False),
+    ('setitem', _repeat(lambda obj, size, idx: obj.__setitem__(idx, idx)), True),
+    ('setitem_slice',
+     _once(lambda obj, size: obj.__setitem__(slice(0, 10), range(10))), True),
+    ('delitem', _repeat(lambda obj, size, idx: obj.__delitem__(-1)), True),
+    ('append', _repeat(lambda obj, size, idx: obj.append(idx)), True),
+    ('extend', _once(lambda obj, size: obj.extend(range(ELEMENT_OPS))), True),
+    ('insert', _repeat(lambda obj, size, idx: obj.insert(0, idx)), True),
+    ('pop', _repeat(lambda obj, size, idx: obj.pop()), True),
+    ('remove', _once(lambda obj, size: obj.remove(size - 1)), True),
+    ('clear', _once(lambda obj, size: obj.clear()), True),
+    ('reverse', _once(lambda obj, size: obj.reverse()), True),
+    ('sort', _once(lambda obj, size: obj.sort()), True),
+]
+BENCHMARKS = collections.OrderedDict(
+    (name, (func, modifies)) for name, func, modifies in _BENCHMARKS
+)
+
+
+def operations(name, size):
+    """
+    Return the number of operations benchmark `name` performs on a list of
+    `size` elements each time it runs.
+    """
+    if name != 'init' and BENCHMARKS[name][0].per_element:
+        return _ops(size)
+    return 1
+
+
+def new_list(list_cls, values):
+    """
+    Return a list of class `list_cls` holding `values` without invoking any
+    set callbacks, so lists can be prepared quickly. A class that publishes
+    snapshots has one published for the new list.
+    """
+    if list_cls is list:
+        return list(values)
+
+    obj = list_cls.__new__(list_cls)
+    ctl = getattr(list_cls, constants.CONTROL_ATTR)
+    setattr(obj, constants.DATA_ATTR, ctl.get_storage().create(values))
+    ctl.publish(obj)
+    return obj
+
+
+def time_benchmark(list_cls, name, size, repeat):
+    """
+    Return the shortest time in seconds taken by benchmark `name` for a list
+    of class `list_cls` with `size` elements in `repeat` runs, per
+    operation.
+    """
+    func, modifies = BENCHMARKS[name]
+    values = list(range(size))
+    obj = new_list(list_cls, values)
+    best = None
+
+    for _ in range(repeat):
+        if modifies:
+            obj = new_list(list_cls, values)
+
+        start = time.perf_counter()
+        func(obj, size)
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best / operations(name, size)
+
+
+def time_construction(list_cls, size, repeat):
+    """
+    Return the shortest time in seconds taken to create a list of class
+    `list_cls` with `size` elements in `repeat` runs.
+    """
+    values = list(range(size))
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list_cls(values)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def run(sizes=SIZES, hooks=None, benchmarks=None, repeat=3, report=None):
+    """
+    Run the benchmarks named in `benchmarks`, or all of them, for lists of
+    each size in `sizes` with each of the hook combinations returned by
+    `hook_sets(hooks)`, and return a list of result dictionaries. Each
+    result holds the time per operation for the pluggable list and for the
+    built-in list, and the ratio of the two as 'overhead'. If `report` is
+    given it is called with each result as it is produced.
+    """
+    names = list(BENCHMARKS) + ['init'] if benchmarks is None else benchmarks
+    results = []
+
+    for label, hook_names in hook_sets(hooks).items():
+        list_cls = make_list_class(hook_names, OPTION_SETS.get(label))
+
+        for size in sizes:
+            for name in names:
+                if name == 'init':
+                    seconds = time_construction(list_cls, size, repeat)
+                    baseline = time_construction(list, size, repeat)
+                else:
+                    seconds = time_benchmark(list_cls, name, size, repeat)
+                    baseline = time_benchmark(list, name, size, repeat)
+
+                result = {
+                    'benchmark': name,
+                    'size': size,
+                    'hooks': label,
+                    'seconds': seconds,
+                    'list_seconds': baseline,
+                    'overhead': seconds / baseline if baseline else None,
+                }
+                results.append(result)
+
+                if report is not None:
+                    report(result)
+
+    return results
+
+
+def _key(result):
+    return (result['benchmark'], result['size'], result['hooks'])
+
+
+def compare(results, baseline, threshold, field='seconds'):
+    """
+    Return a list of (result, baseline result) pairs for the results in
+    `results` whose value for `field` is more than `threshold` times that
+    of the result for the same benchmark, size and hooks in `baseline`.
+    """
+    previous = {_key(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        old = previous.get(_key(result))
+        if old is not None and result[field] > old[field] * threshold:
+            regressions.append((result, old))
+
+    return regressions
+
+
+def _print_result(result):
+    overhead = result['overhead']
+    print('{:<14} {:>8} {:<16} {:>12.3e}s {:>9}'.format(
+        result['benchmark'], result['size'], result['hooks'], result['seconds'],
+        '-' if overhead is None else '{:.1f}x'.format(overhead)
+    ))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pluggable_list.bench',
+        description='Time the methods of pluggable lists against list.'
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(SIZES),
+        help='list sizes to benchmark'
+    )
+    parser.add_argument(
+        '--hooks', nargs='+', choices=sorted(hook_sets()),
+        help='hook combinations to benchmark (default: all)'
+    )
+    parser.add_argument(
+        '--benchmarks', nargs='+', choices=sorted(list(BENCHMARKS) + ['init']),
+        help='benchmarks to run (default: all)'
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='runs of each benchmark, of which the fastest is reported'
+    )
+    parser.add_argument('--save', metavar='PATH', help='save results as JSON')
+    parser.add_argument(
+        '--compare', metavar='PATH',
+        help='compare results with a baseline saved with --save'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=1.25,
+        help='slowdown relative to the baseline reported as a regression'
+    )
+    args = parser.parse_args(argv)
+
+    print('{:<14} {:>8} {:<16} {:>13} {:>9}'.format(
+        'benchmark', 'size', 'hooks', 'time/op', 'overhead'
+    ))
+    results = run(
+        args.sizes, args.hooks, args.benchmarks, args.repeat, _print_result
+    )
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as save_file:
+            json.dump(
+                {'python': sys.version, 'results': results}, save_file, indent=2
+            )
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+        regressions = compare(results, baseline, args.threshold)
+
+        for result, old in regressions:
+            print('regression: {} size {} hooks {}: {:.3e}s, was {:.3e}s'.format(
+                result['benchmark'], result['size'], result['hooks'],
+                result['seconds'], old['seconds']
+            ))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+the cache used to memoize the values returned by get callbacks.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import collections
+import threading
+
+
+class LRUCache:
+    """
+    A cache of at most `capacity` entries, keyed by index, that discards the
+    least recently used entry when it is full. Counts of hits, misses and
+    evictions are kept.
+
+    Looking up an entry updates how recently it was used, so the cache holds
+    its own lock: readers of a thread safe list share its lock, and may use
+    the cache at the same time.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, idx, default=None):
+        """
+        Return the value cached for `idx`, or `default` if there is none.
+        """
+        with self._lock:
+            try:
+                value = self._entries[idx]
+            except KeyError:
+                self.misses += 1
+                return default
+            else:
+                self._entries.move_to_end(idx)
+                self.hits += 1
+                return value
+
+    def put(self, idx, value):
+        """
+        Cache `value` for `idx`, evicting the least recently used entry if
+        the cache is full.
+        """
+        with self._lock:
+            self._entries[idx] = value
+            self._entries.move_to_end(idx)
+
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, idx):
+        """
+        Remove any value cached for `idx`.
+        """
+        with self._lock:
+            self._entries.pop(idx, None)
+
+    def discard_from(self, idx):
+        """
+        Remove any values cached for `idx` and all greater indices.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key >= idx]:
+                del self._entries[key]
+
+    def inserted(self, indices, values):
+        """
+        Discard the values cached for elements shifted by the insertion of
+        elements at the ascending indices `indices`.
+        """
+        self.discard_from(indices[0])
+
+    def deleted(self, indices, values):
+        """
+        Discard the values cached for elements deleted from or shifted by
+        the deletion of elements at the ascending indices `indices`.
+        """
+        self.discard_from(indices[0])
+
+    def replaced(self, idx, old_value, new_value):
+        """
+        Discard the value cached for the replaced element at index `idx`.
+        """
+        self.discard(idx)
+
+    def reordered(self):
+        """
+        Discard all cached values after the elements have been reordered.
+        """
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all cached values.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return a dictionary of the hit, miss and eviction counts and the
+        size and capacity of the cache.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'capacity': self.capacity,
+            }
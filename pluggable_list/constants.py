@@ -26,6 +26,18 @@ import enum
 DATA_ATTR = '_pluggable_list_data'
 CONTROL_ATTR = '_pluggable_list_control'
 REGISTER_ATTR = '_pluggable_list_register'
+JOURNAL_ATTR = '_pluggable_list_journal'
+VERSION_ATTR = '_pluggable_list_version'
+CACHE_ATTR = '_pluggable_list_cache'
+INDEX_ATTR = '_pluggable_list_index'
+LOCK_ATTR = '_pluggable_list_lock'
+SNAPSHOT_ATTR = '_pluggable_list_snapshot'
+
+# the attributes of pluggable list instances, which are held in slots
+INSTANCE_ATTRS = (
+    DATA_ATTR, JOURNAL_ATTR, VERSION_ATTR, CACHE_ATTR, INDEX_ATTR, LOCK_ATTR,
+    SNAPSHOT_ATTR,
+)
 
 
 class Hook(enum.IntEnum):
@@ -36,3 +48,18 @@ class Hook(enum.IntEnum):
     begin_operation = 4
     end_operation = 5
     revert = 6
+    get_many = 7
+    set_many = 8
+    remove_many = 9
+    search_key = 10
+    sort_many = 11
+
+
+# batch hooks whose callbacks handle many elements at once, keyed by the
+# hook whose callbacks handle a single element
+BATCH_HOOKS = {
+    Hook.get: Hook.get_many,
+    Hook.set: Hook.set_many,
+    Hook.remove: Hook.remove_many,
+    Hook.sort: Hook.sort_many,
+}
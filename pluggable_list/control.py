@@ -19,11 +19,24 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import concurrent.futures
 import contextlib
-from . import exceptions, constants
+import os
+import sys
+import threading
+from . import exceptions, constants, cache, index, locks, instrumentation
+
+
+_NOT_CACHED = object()
+
+# held while creating the lock, get cache or index of a list so only one is
+# created
+_LOCK_CREATION = threading.Lock()
 
 
 class ListProxy:
+    __slots__ = ('_real_list',)
+
     def __init__(self, real_list):
         self._real_list = real_list
 
@@ -34,15 +47,487 @@ class ListProxy:
         return iter(self._real_list)
 
 
+class DeletionProxy(ListProxy):
+    """
+    A ListProxy for a list whose elements at `indices`, a strictly monotone
+    sequence such as a range, are being removed in a single step. The proxy
+    presents the list as it would be if the first `removed` of those
+    elements had been removed one at a time. Elements are found by binary
+    search over the indices removed, so reading one takes time logarithmic
+    in the number removed.
+    """
+    __slots__ = ('_indices', '_descending', 'removed')
+
+    def __init__(self, real_list, indices):
+        super().__init__(real_list)
+        self._indices = indices
+        self._descending = len(indices) > 1 and indices[0] > indices[1]
+        self.removed = 0
+
+    def _length(self):
+        return len(self._real_list) - self.removed
+
+    def _removed_index(self, rank):
+        """
+        Return the `rank`th smallest of the indices removed so far.
+        """
+        if self._descending:
+            return self._indices[self.removed - 1 - rank]
+        return self._indices[rank]
+
+    def _real_index(self, idx):
+        """
+        Return the index in the real list of the element at index `idx` of
+        the list the proxy presents.
+        """
+        length = self._length()
+
+        if idx < 0:
+            idx += length
+
+        if not 0 <= idx < length:
+            raise IndexError('list index out of range')
+
+        # count the removed indices before the element; the removed index
+        # of rank r has r removed indices before it, so it is preceded by
+        # the element at index (removed index - r) of the presented list
+        low, high = 0, self.removed
+        while low < high:
+            mid = (low + high) // 2
+            if self._removed_index(mid) - mid <= idx:
+                low = mid + 1
+            else:
+                high = mid
+
+        return idx + low
+
+    def __getitem__(self, spec):
+        if isinstance(spec, slice):
+            return [self[idx] for idx in range(*spec.indices(self._length()))]
+        return self._real_list[self._real_index(spec)]
+
+    def __iter__(self):
+        return (self[idx] for idx in range(self._length()))
+
+
+class InsertionProxy(ListProxy):
+    """
+    A ListProxy for a list into which `values` are being inserted at
+    `indices` in a single step. The proxy presents the list as it would be
+    if the first `inserted` values had been inserted one at a time, each at
+    its index in `indices`, which either ascend strictly or never ascend.
+    Elements are found by binary search over the positions of the values
+    inserted, so reading one takes time logarithmic in the number inserted.
+    """
+    __slots__ = ('_indices', '_values', '_ascending', 'inserted')
+
+    def __init__(self, real_list, indices, values):
+        super().__init__(real_list)
+        self._indices = indices
+        self._values = values
+        self._ascending = len(indices) < 2 or indices[0] < indices[1]
+        self.inserted = 0
+
+    def _length(self):
+        return len(self._real_list) + self.inserted
+
+    def _position(self, count):
+        """
+        Return the index in the presented list of the `count`th value
+        inserted. Each value inserted at or before an earlier value moves it
+        along by one, as every later value is when the indices never ascend.
+        """
+        if self._ascending:
+            return self._indices[count]
+        return self._indices[count] + self.inserted - 1 - count
+
+    def _get(self, idx):
+        length = self._length()
+
+        if idx < 0:
+            idx += length
+
+        if not 0 <= idx < length:
+            raise IndexError('list index out of range')
+
+        # find how many of the values inserted are before the element; their
+        # positions ascend with count, or descend if the indices never ascend
+        low, high = 0, self.inserted
+        while low < high:
+            mid = (low + high) // 2
+            if (self._position(mid) < idx) == self._ascending:
+                low = mid + 1
+            else:
+                high = mid
+
+        if self._ascending:
+            before, candidate = low, low
+        else:
+            before, candidate = self.inserted - low, low - 1
+
+        if 0 <= candidate < self.inserted and self._position(candidate) == idx:
+            return self._values[candidate]
+        return self._real_list[idx - before]
+
+    def __getitem__(self, spec):
+        if isinstance(spec, slice):
+            return [self._get(idx) for idx in range(*spec.indices(self._length()))]
+        return self._get(spec)
+
+    def __iter__(self):
+        return (self._get(idx) for idx in range(self._length()))
+
+
+def _invoke_chunk(callback_func, pl_obj, hook, proxy, indices, values):
+    """
+    Invoke `callback_func` for each index in `indices` and the corresponding
+    value in `values`, returning a list of the results.
+    """
+    return [
+        callback_func(pl_obj, hook, proxy, idx, value)
+        for idx, value in zip(indices, values)
+    ]
+
+
+def _invoke_chunk_in_process(list_cls, hook, indices, values):
+    """
+    Invoke the callback of `list_cls` for hook `hook` in a worker process.
+    The callback is passed a new, empty instance of `list_cls` and a proxy
+    for an empty list.
+    """
+    return _invoke_chunk(
+        getattr(list_cls, constants.CONTROL_ATTR).get_callback(hook),
+        list_cls.__new__(list_cls), hook, ListProxy([]), indices, values
+    )
+
+
+class Journal:
+    """
+    Records the inverse of every structural change made to a list so the
+    changes can be undone. The cost of undoing an operation is proportional
+    to the number of changes it made, not to the size of the list.
+
+    Each change, including those made when undoing changes, is reported to
+    every object in `observers` by invoking its `inserted`, `deleted`,
+    `replaced` or `reordered` method. If an observer rejects a change by
+    raising an exception the change is undone before the exception is
+    propagated.
+
+    The journal records the thread that created it in its `thread`
+    attribute. If `stats`, an `instrumentation.Stats` object, is given the
+    size of every entry and of any elements it copies, and every rollback,
+    are recorded in it.
+    """
+    _INSERTED = 0
+    _DELETED = 1
+    _REPLACED = 2
+    _EXTENDED = 3
+    _DELETED_RANGE = 4
+    _INSERTED_RANGE = 5
+    _REVERSED = 6
+    _REORDERED = 7
+
+    __slots__ = ('_data', '_observers', '_stats', '_entries', 'changes', 'thread')
+
+    def __init__(self, data, observers=(), stats=None):
+        self._data = data
+        self._observers = observers
+        self._stats = stats
+        self._entries = []
+        self.changes = 0
+        self.thread = threading.get_ident()
+
+    def _record(self, entry):
+        self._entries.append(entry)
+        self.changes += 1
+
+        if self._stats is not None:
+            action, _, value = entry
+            nbytes = sys.getsizeof(entry)
+            if action in (self._DELETED_RANGE, self._REORDERED):
+                nbytes += sys.getsizeof(value)
+            self._stats.record_journal(nbytes)
+
+    def _notify(self, event, *args):
+        for observer in self._observers:
+            getattr(observer, event)(*args)
+
+    def _notify_inserted(self, indices):
+        """
+        Notify observers that elements were inserted at the ascending
+        indices `indices`, deleting the elements if an observer rejects
+        them.
+        """
+        if self._observers:
+            spec = slice(indices.start, indices[-1] + 1, indices.step)
+            try:
+                self._notify('inserted', indices, self._data[spec])
+            except:
+                del self._data[spec]
+                raise
+
+    def mark(self):
+        """
+        Return a marker for the current position in the journal that can
+        later be passed to `rollback`.
+        """
+        return len(self._entries)
+
+    def append(self, value):
+        """
+        Add `value` to the end of the list.
+        """
+        idx = len(self._data)
+        self._data.append(value)
+        self._notify_inserted(range(idx, idx + 1))
+        self._record((self._INSERTED, idx, None))
+
+    def extend(self, values):
+        """
+        Add all the values yielded by `values` to the end of the list.
+        """
+        idx = len(self._data)
+
+        try:
+            self._data.extend(values)
+        except:
+            del self._data[idx:]
+            raise
+
+        if len(self._data) > idx:
+            self._notify_inserted(range(idx, len(self._data)))
+
+        self._record((self._EXTENDED, idx, None))
+
+    def insert(self, idx, value):
+        """
+        Insert `value` before index `idx`. `idx` must be a non-negative index
+        no greater than the length of the list.
+        """
+        if not 0 <= idx <= len(self._data):
+            raise IndexError('journal index out of range')
+
+        self._data.insert(idx, value)
+        self._notify_inserted(range(idx, idx + 1))
+        self._record((self._INSERTED, idx, None))
+
+    def delete(self, idx):
+        """
+        Delete and return the element at index `idx`, which must be a
+        non-negative index less than the length of the list.
+        """
+        if not 0 <= idx < len(self._data):
+            raise IndexError('journal index out of range')
+
+        value = self._data[idx]
+        del self._data[idx]
+        self._record((self._DELETED, idx, value))
+        self._notify('deleted', range(idx, idx + 1), (value,))
+        return value
+
+    def insert_range(self, indices, values):
+        """
+        Insert each value in the sequence `values` so that it ends up at the
+        corresponding index in the range `indices`, in a single step.
+        `indices` must be the normalised indices of a slice of the list as it
+        will be after the insertion.
+        """
+        if len(values) != len(indices):
+            raise ValueError(
+                'attempt to insert {} values at {} indices'
+                .format(len(values), len(indices))
+            )
+
+        if indices.step < 0:
+            indices = indices[::-1]
+            values = values[::-1]
+
+        if indices:
+            self._insert_at(indices, values)
+            self._notify_inserted(indices)
+            self._record((self._INSERTED_RANGE, indices, None))
+
+    def delete_range(self, indices):
+        """
+        Delete the elements at the indices in the range `indices`, which
+        must be normalised as by `slice.indices`, in a single step.
+        """
+        if indices.step < 0:
+            indices = indices[::-1]
+
+        if indices:
+            spec = slice(indices.start, indices[-1] + 1, indices.step)
+            values = self._data[spec]
+            del self._data[spec]
+            self._record((self._DELETED_RANGE, indices, values))
+            self._notify('deleted', indices, values)
+
+    def reverse(self):
+        """
+        Reverse the list in place.
+        """
+        self._data.reverse()
+        self._record((self._REVERSED, None, None))
+        self._notify('reordered')
+
+    def reorder(self, values):
+        """
+        Replace the elements of the list with the sequence `values`, which
+        must hold the same elements in a different order.
+        """
+        old_values = self._data[:]
+        self._replace_all(values)
+        self._record((self._REORDERED, None, old_values))
+        self._notify('reordered')
+
+    def replace(self, idx, value):
+        """
+        Replace the element at index `idx`, which must be a non-negative
+        index less than the length of the list, with `value`.
+        """
+        if not 0 <= idx < len(self._data):
+            raise IndexError('journal index out of range')
+
+        old_value = self._data[idx]
+        self._data[idx] = value
+
+        try:
+            self._notify('replaced', idx, old_value, self._data[idx])
+        except:
+            self._data[idx] = old_value
+            raise
+
+        self._record((self._REPLACED, idx, old_value))
+
+    def _replace_all(self, values):
+        segment = self._data[0:0]
+        segment.extend(values)
+        self._data[:] = segment
+
+    def _insert_at(self, indices, values):
+        """
+        Insert `values` so that they end up at the ascending indices
+        `indices`.
+        """
+        start = indices.start
+        end = indices[-1] + 1 - len(indices)
+        segment = self._data[start:start]
+
+        if indices.step == 1:
+            segment.extend(values)
+        else:
+            kept = iter(self._data[start:end])
+            inserted = iter(values)
+            segment.extend(
+                next(inserted) if (idx - start) % indices.step == 0 else next(kept)
+                for idx in range(start, indices[-1] + 1)
+            )
+
+        self._data[start:end] = segment
+
+    def rollback(self, mark=0):
+        """
+        Undo all changes recorded since `mark` by replaying their inverses
+        in reverse order. Undoing a change counts as a change.
+        """
+        data = self._data
+
+        if self._stats is not None:
+            self._stats.record_rollback()
+
+        while len(self._entries) > mark:
+            action, idx, value = self._entries.pop()
+            self.changes += 1
+
+            if action == self._INSERTED:
+                value = data[idx]
+                del data[idx]
+                self._notify('deleted', range(idx, idx + 1), (value,))
+            elif action == self._EXTENDED:
+                indices = range(idx, len(data))
+                value = data[idx:]
+                del data[idx:]
+                if indices:
+                    self._notify('deleted', indices, value)
+            elif action == self._DELETED:
+                data.insert(idx, value)
+                self._notify('inserted', range(idx, idx + 1), (value,))
+            elif action == self._DELETED_RANGE:
+                self._insert_at(idx, value)
+                self._notify('inserted', idx, value)
+            elif action == self._INSERTED_RANGE:
+                spec = slice(idx.start, idx[-1] + 1, idx.step)
+                value = data[spec]
+                del data[spec]
+                self._notify('deleted', idx, value)
+            elif action == self._REVERSED:
+                data.reverse()
+                self._notify('reordered')
+            elif action == self._REORDERED:
+                self._replace_all(value)
+                self._notify('reordered')
+            else:
+                new_value = data[idx]
+                data[idx] = value
+                self._notify('replaced', idx, new_value, value)
+
+
 class Control:
     """
     A instance of the Control class encapsulates callback state and
     functionallity for a PluggableList class as well as providing some
     utility methods
     """
-    def __init__(self, list_cls, callbacks):
+    __slots__ = (
+        '_list_cls', '_options', '_stats', '_callbacks', '_executor',
+        '_begin_op', '_end_op', '_plain_hooks',
+    )
+
+    def __init__(self, list_cls, callbacks, options):
         self._list_cls = list_cls
+        self._options = options
+        self._stats = None
+        callbacks = {
+            hook: instrumentation.original_callback(callback_func)
+            for hook, callback_func in callbacks.items()
+        }
+
+        if options['instrument']:
+            self._stats = instrumentation.Stats()
+            callbacks = {
+                hook: self._stats.time_callback(hook, callback_func)
+                for hook, callback_func in callbacks.items()
+                if callback_func is not None
+            }
+
         self._callbacks = callbacks
+        self._executor = None
+        self._begin_op = callbacks.get(constants.Hook.begin_operation)
+        self._end_op = callbacks.get(constants.Hook.end_operation)
+
+        # changes made outside `op` are not seen by the index or get cache
+        if options['index_values'] or options['get_cache_size']:
+            observed_hooks = (constants.Hook.set, constants.Hook.remove)
+        else:
+            observed_hooks = ()
+
+        self._plain_hooks = frozenset(
+            hook for hook in constants.Hook
+            if not self._locked(options) and not options['storage'].shared and
+            self._begin_op is None and self._end_op is None and
+            callbacks.get(hook) is None and
+            callbacks.get(constants.BATCH_HOOKS.get(hook)) is None and
+            hook not in observed_hooks
+        )
+
+    @staticmethod
+    def _locked(options):
+        """
+        Return true if operations on lists with options `options` hold a
+        ReadWriteLock. Publishing snapshots needs modifying operations to run
+        one at a time, so it implies thread safety.
+        """
+        return options['thread_safe'] or options['snapshot_reads']
 
     def get_callback(self, hook):
         """
@@ -53,6 +538,45 @@ class Control:
         except KeyError:
             raise exceptions.CallbackDoesNotExist(hook)
 
+    def get_option(self, option):
+        """
+        Return the value of option `option` for this Control object's
+        pluggable list class.
+        """
+        return self._options[option]
+
+    def get_stats(self):
+        """
+        Return the `instrumentation.Stats` object recording the callbacks
+        and operations of this Control object's pluggable list class, or
+        None if the class is not instrumented.
+        """
+        return self._stats
+
+    def stats(self):
+        """
+        Return a dictionary of the latencies of the callbacks, by hook, and
+        operations, by method name, of this Control object's pluggable list
+        class, the bytes saved by journals and the rollbacks performed, as
+        returned by `instrumentation.Stats.as_dict`, or None if the class
+        is not instrumented.
+        """
+        return None if self._stats is None else self._stats.as_dict()
+
+    def reset_stats(self):
+        """
+        Discard everything recorded by `stats`.
+        """
+        if self._stats is not None:
+            self._stats.reset()
+
+    def get_storage(self):
+        """
+        Return the storage backend used by this Control object's pluggable
+        list class.
+        """
+        return self._options['storage']
+
     def has_callback(self, hook):
         """
         Return true if this Control object's pluggable list has a callback for
@@ -60,6 +584,199 @@ class Control:
         """
         return self._callbacks.get(hook) is not None
 
+    def is_plain(self, hook):
+        """
+        Return true if this Control object's pluggable list has no callback
+        for hook `hook` and no begin_operation or end_operation callbacks and
+        is neither thread safe nor shared between processes, and, for the set
+        and remove hooks, keeps no index or get cache that must observe
+        changes, in which case an operation that only uses hook `hook` can
+        bypass `op` and access the data structure directly.
+        """
+        return hook in self._plain_hooks
+
+    def bind(self, pl_obj, hook, proxy=None):
+        """
+        Return a function that invokes the callback for hook `hook` on
+        `pl_obj` with the arguments it is passed, or None if there is no
+        callback for hook `hook`. The returned function shares a single
+        ListProxy between invocations, `proxy` if it is given.
+
+        If hook `hook` has no callback but its batch hook does, the returned
+        function invokes the batch callback with a batch of one element.
+
+        If `pl_obj` caches the values returned by get callbacks, the returned
+        function for the get hook only invokes the callback for elements
+        whose values are not cached.
+        """
+        callback_func = self._callbacks.get(hook)
+
+        if callback_func is None:
+            invoke_many = self.bind_many(pl_obj, hook, proxy)
+
+            if invoke_many is None:
+                return None
+
+            def invoke_one(idx, value):
+                result = invoke_many((idx,), (value,))
+                return value if result is None else result[0]
+
+            return invoke_one
+
+        if proxy is None:
+            proxy = ListProxy(getattr(pl_obj, constants.DATA_ATTR))
+
+        def invoke(*args):
+            return callback_func(pl_obj, hook, proxy, *args)
+
+        get_cache = self.get_cache(pl_obj) if hook == constants.Hook.get else None
+
+        if get_cache is None:
+            return invoke
+
+        data = getattr(pl_obj, constants.DATA_ATTR)
+
+        def invoke_cached(idx, value):
+            key = idx + len(data) if idx < 0 else idx
+            result = get_cache.get(key, _NOT_CACHED)
+            if result is _NOT_CACHED:
+                result = invoke(idx, value)
+                get_cache.put(key, result)
+            return result
+
+        return invoke_cached
+
+    def bind_many(self, pl_obj, hook, proxy=None):
+        """
+        Return a function that takes a sequence of indices and a sequence of
+        values and invokes the callback for the batch hook of hook `hook` on
+        `pl_obj`, or None if there is no such callback. For get and set hooks
+        the returned function returns the list of values returned by the
+        callback.
+
+        If there is no callback for the batch hook of a get or set hook but
+        the class uses an executor, the returned function invokes the
+        callback for hook `hook` for each element using the executor.
+        """
+        batch_hook = constants.BATCH_HOOKS.get(hook)
+        callback_func = self._callbacks.get(batch_hook)
+
+        if proxy is None:
+            proxy = ListProxy(getattr(pl_obj, constants.DATA_ATTR))
+
+        if callback_func is None:
+            invoke_many = self._bind_executor(pl_obj, hook, proxy)
+
+            if invoke_many is None:
+                return None
+        elif batch_hook == constants.Hook.remove_many:
+            def invoke_many(indices, values):
+                callback_func(pl_obj, batch_hook, proxy, indices, values)
+        else:
+            def invoke_many(indices, values):
+                result = list(
+                    callback_func(pl_obj, batch_hook, proxy, indices, values)
+                )
+                if len(result) != len(values):
+                    raise exceptions.IncorrectNumberOfValues(len(result))
+                return result
+
+        get_cache = self.get_cache(pl_obj) if hook == constants.Hook.get else None
+
+        if get_cache is None:
+            return invoke_many
+
+        data = getattr(pl_obj, constants.DATA_ATTR)
+
+        def invoke_many_cached(indices, values):
+            keys = [idx + len(data) if idx < 0 else idx for idx in indices]
+            result = [get_cache.get(key, _NOT_CACHED) for key in keys]
+            missing = [n for n, value in enumerate(result) if value is _NOT_CACHED]
+
+            if missing:
+                fetched = invoke_many(
+                    [indices[n] for n in missing], [values[n] for n in missing]
+                )
+                for n, value in zip(missing, fetched):
+                    result[n] = value
+                    get_cache.put(keys[n], value)
+
+            return result
+
+        return invoke_many_cached
+
+    def get_executor(self):
+        """
+        Return the executor that invokes get and set callbacks for batch
+        operations, creating it if needed, or None if this Control object's
+        pluggable list class does not use one.
+        """
+        kind = self._options['executor']
+
+        if kind is None:
+            return None
+
+        if self._executor is None:
+            if kind == 'thread':
+                executor_cls = concurrent.futures.ThreadPoolExecutor
+            else:
+                executor_cls = concurrent.futures.ProcessPoolExecutor
+            self._executor = executor_cls(self._executor_workers())
+
+        return self._executor
+
+    def _executor_workers(self):
+        return self._options['executor_workers'] or os.cpu_count() or 1
+
+    def _bind_executor(self, pl_obj, hook, proxy):
+        """
+        Return a function that takes a sequence of indices and a sequence of
+        values and invokes the callback for hook `hook` on `pl_obj` for each
+        of them using the executor, returning a list of the results in
+        order, or None if there is no executor or no callback for hook
+        `hook`. Every invocation has finished before any exception raised by
+        one is propagated.
+        """
+        callback_func = self._callbacks.get(hook)
+        executor = self.get_executor()
+
+        if (executor is None or callback_func is None or
+                hook not in (constants.Hook.get, constants.Hook.set)):
+            return None
+
+        chunk_size = self._options['executor_chunk_size']
+        workers = self._executor_workers()
+
+        def invoke_many(indices, values):
+            size = chunk_size or -(-len(values) // workers)
+
+            if len(values) <= size:
+                return _invoke_chunk(
+                    callback_func, pl_obj, hook, proxy, indices, values
+                )
+
+            futures = []
+
+            for start in range(0, len(values), size):
+                chunk = (indices[start:start + size], values[start:start + size])
+                if self._options['executor'] == 'thread':
+                    futures.append(executor.submit(
+                        _invoke_chunk, callback_func, pl_obj, hook, proxy, *chunk
+                    ))
+                else:
+                    futures.append(executor.submit(
+                        _invoke_chunk_in_process, self._list_cls, hook, *chunk
+                    ))
+
+            concurrent.futures.wait(futures)
+
+            result = []
+            for future in futures:
+                result.extend(future.result())
+            return result
+
+        return invoke_many
+
     def invoke_callback(self, hook, pl_obj, *args, **kwargs):
         try:
             callback_func = self._callbacks[hook]
@@ -84,6 +801,179 @@ class Control:
     def _revert(self, pl_obj):
         self.invoke_callback_safe(None)(constants.Hook.revert, pl_obj)
 
+    def get_cache(self, pl_obj):
+        """
+        Return the cache of values returned by get callbacks for `pl_obj`,
+        creating it if needed, or None if this Control object's pluggable
+        list class does not cache them. Lists that publish snapshots do not
+        cache them, as snapshot reads run outside of any operation.
+        """
+        capacity = self._options['get_cache_size']
+
+        if not capacity or self._options['snapshot_reads']:
+            return None
+
+        try:
+            return getattr(pl_obj, constants.CACHE_ATTR)
+        except AttributeError:
+            pass
+
+        # readers holding the shared lock of a thread safe list may ask for
+        # the cache at the same time, so only one is created
+        with _LOCK_CREATION:
+            try:
+                return getattr(pl_obj, constants.CACHE_ATTR)
+            except AttributeError:
+                get_cache = cache.LRUCache(capacity)
+                setattr(pl_obj, constants.CACHE_ATTR, get_cache)
+                return get_cache
+
+    def get_index(self, pl_obj):
+        """
+        Return the index of the values of `pl_obj`, creating it if needed, or
+        None if this Control object's pluggable list class does not index
+        its values.
+        """
+        if not self._options['index_values']:
+            return None
+
+        try:
+            return getattr(pl_obj, constants.INDEX_ATTR)
+        except AttributeError:
+            pass
+
+        with _LOCK_CREATION:
+            try:
+                return getattr(pl_obj, constants.INDEX_ATTR)
+            except AttributeError:
+                value_index = index.ValueIndex(
+                    getattr(pl_obj, constants.DATA_ATTR),
+                    self.bind(pl_obj, constants.Hook.search_key)
+                )
+                setattr(pl_obj, constants.INDEX_ATTR, value_index)
+                return value_index
+
+    def get_lock(self, pl_obj):
+        """
+        Return the ReadWriteLock that operations on `pl_obj` hold, creating
+        it if needed, or None if this Control object's pluggable list class
+        is neither thread safe nor publishes snapshots. If the storage backend of the class is shared
+        between processes the lock it provides is returned instead.
+        """
+        storage_backend = self._options['storage']
+
+        if storage_backend.shared:
+            return storage_backend.lock(getattr(pl_obj, constants.DATA_ATTR))
+        elif not self._locked(self._options):
+            return None
+
+        try:
+            return getattr(pl_obj, constants.LOCK_ATTR)
+        except AttributeError:
+            pass
+
+        with _LOCK_CREATION:
+            try:
+                return getattr(pl_obj, constants.LOCK_ATTR)
+            except AttributeError:
+                lock = locks.ReadWriteLock()
+                setattr(pl_obj, constants.LOCK_ATTR, lock)
+                return lock
+
+    def snapshot(self, pl_obj):
+        """
+        Return the immutable snapshot of the data of `pl_obj` published by
+        `publish`, which may be read without holding any lock, or None if
+        this Control object's pluggable list class does not publish
+        snapshots or the calling thread is running a modifying operation on
+        `pl_obj` and so must read the data itself to see its own changes.
+        """
+        if not self._options['snapshot_reads']:
+            return None
+
+        journal = getattr(pl_obj, constants.JOURNAL_ATTR, None)
+
+        if journal is not None and journal.thread == threading.get_ident():
+            return None
+
+        return getattr(pl_obj, constants.SNAPSHOT_ATTR, ())
+
+    def publish(self, pl_obj):
+        """
+        Replace the snapshot of the data of `pl_obj` with a new one if this
+        Control object's pluggable list class publishes snapshots. The new
+        snapshot is swapped in with a single attribute assignment, so
+        readers see either the old or the new snapshot. It is a complete
+        copy of the data, so publishing takes time linear in its length.
+        """
+        if self._options['snapshot_reads']:
+            setattr(
+                pl_obj, constants.SNAPSHOT_ATTR,
+                tuple(getattr(pl_obj, constants.DATA_ATTR))
+            )
+
+    def observers(self, pl_obj):
+        """
+        Return a list of the objects that must be notified of changes to the
+        data of `pl_obj`.
+        """
+        return [
+            observer for observer in
+            (self.get_cache(pl_obj), self.get_index(pl_obj))
+            if observer is not None
+        ]
+
+    def journal(self, pl_obj):
+        """
+        Return the journal that records changes made to the data of
+        `pl_obj` during the current modifying operation.
+        """
+        return getattr(pl_obj, constants.JOURNAL_ATTR)
+
+    def version(self, pl_obj):
+        """
+        Return the modification count of `pl_obj`, which increases whenever
+        the data of `pl_obj` is changed.
+        """
+        version = getattr(pl_obj, constants.VERSION_ATTR, 0)
+        journal = getattr(pl_obj, constants.JOURNAL_ATTR, None)
+
+        if journal is not None:
+            version += journal.changes
+
+        return version
+
+    def count_modification(self, pl_obj):
+        """
+        Increase the modification count of `pl_obj` to reflect a change made
+        to its data outside of a modifying operation, discarding any cached
+        values, rebuilding any index of its values and publishing a new
+        snapshot if the class publishes snapshots.
+        """
+        setattr(
+            pl_obj, constants.VERSION_ATTR,
+            getattr(pl_obj, constants.VERSION_ATTR, 0) + 1
+        )
+
+        get_cache = getattr(pl_obj, constants.CACHE_ATTR, None)
+
+        if get_cache is not None:
+            get_cache.clear()
+
+        value_index = getattr(pl_obj, constants.INDEX_ATTR, None)
+
+        if value_index is not None:
+            value_index.rebuild()
+
+        self.publish(pl_obj)
+
+    def in_op(self, pl_obj):
+        """
+        Return true if a modifying operation, such as a transaction, is in
+        progress on `pl_obj`.
+        """
+        return getattr(pl_obj, constants.JOURNAL_ATTR, None) is not None
+
     @contextlib.contextmanager
     def op(self, pl_obj, *, modify=False, fetch=False, safe=False):
         """
@@ -93,16 +983,26 @@ class Control:
         is raised and the operation has declared it is modifying the data
         structure, any changes are reverted. Finally the end_operation
         callback is if one exists.
-        """
-        if modify:
-            save_point = getattr(pl_obj, constants.DATA_ATTR).copy()
 
-        invoked_callbacks = []
+        Modifying operations must make their changes through the journal
+        returned by `journal` so they can be reverted.
 
+        An operation run while a modifying operation is in progress on the
+        same object is part of that operation: no begin_operation,
+        end_operation or revert callbacks are invoked for it, and if it
+        raises an exception only its own changes are undone.
+
+        If the class is thread safe or publishes snapshots, or its storage
+        backend is shared between processes, the operation holds the lock returned by `get_lock`,
+        exclusively if it is modifying, until it has finished, including
+        reverting any changes.
+
+        If the class publishes snapshots a modifying operation that changed
+        the data publishes a new snapshot when it succeeds, before the lock
+        is released, so readers of snapshots only ever see committed data.
+        """
         def invoke(hook, *args, **kwargs):
-            result = self.invoke_callback(hook, pl_obj, *args, **kwargs)
-            invoked_callbacks.append((hook, args, kwargs))
-            return result
+            return self.invoke_callback(hook, pl_obj, *args, **kwargs)
 
         def invoke_safe(default):
             def func(hook, *args, **kwargs):
@@ -112,21 +1012,66 @@ class Control:
                     return default
             return func
 
-        self.invoke_callback_safe(None)(
-            constants.Hook.begin_operation, pl_obj, modify=modify, fetch=fetch
-        )
-
         if safe:
             func = invoke_safe
         else:
             func = invoke
 
+        lock = self.get_lock(pl_obj)
+        release = None
+
+        if lock is not None:
+            release = lock.acquire_write() if modify else lock.acquire_read()
+
         try:
-            yield func
-        except:
+            journal = getattr(pl_obj, constants.JOURNAL_ATTR, None)
+
+            if journal is not None:
+                save_point = journal.mark()
+                try:
+                    yield func
+                except:
+                    journal.rollback(save_point)
+                    raise
+                return
+
+            if self._begin_op is not None:
+                self._begin_op(
+                    pl_obj, constants.Hook.begin_operation,
+                    ListProxy(getattr(pl_obj, constants.DATA_ATTR)),
+                    modify=modify, fetch=fetch
+                )
+
             if modify:
-                self._revert(pl_obj)
-                setattr(pl_obj, constants.DATA_ATTR, save_point)
-            raise
+                journal = Journal(
+                    getattr(pl_obj, constants.DATA_ATTR), self.observers(pl_obj),
+                    self._stats
+                )
+                setattr(pl_obj, constants.JOURNAL_ATTR, journal)
+
+            try:
+                yield func
+            except:
+                if modify:
+                    self._revert(pl_obj)
+                    journal.rollback()
+                raise
+            else:
+                if modify:
+                    setattr(
+                        pl_obj, constants.VERSION_ATTR,
+                        getattr(pl_obj, constants.VERSION_ATTR, 0) + journal.changes
+                    )
+                    if journal.changes:
+                        self.publish(pl_obj)
+            finally:
+                if modify:
+                    delattr(pl_obj, constants.JOURNAL_ATTR)
+                if self._end_op is not None:
+                    self._end_op(
+                        pl_obj, constants.Hook.end_operation,
+                        ListProxy(getattr(pl_obj, constants.DATA_ATTR))
+                    )
         finally:
-            self.invoke_callback_safe(None)(constants.Hook.end_operation, pl_obj)
+            if release is not None:
+                release()
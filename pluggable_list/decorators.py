@@ -76,10 +76,80 @@ def remove_callback():
     return wrapper
 
 
+def get_many_callback():
+    """
+    Method decorator that marks the method as a get many callback. The method
+    is passed a sequence of indices and a sequence of the values at those
+    indices and must return a sequence of the values to be returned.
+    """
+    def wrapper(func):
+        """
+        Set a flag on the method `func` so that when the method's class is
+        created the creater knows to register the method as a get many
+        callback.
+        """
+        _register_hook(func, Hook.get_many)
+        return func
+    return wrapper
+
+
+def set_many_callback():
+    """
+    Method decorator that marks the method as a set many callback. The method
+    is passed a sequence of indices and a sequence of the values to be added
+    at those indices and must return a sequence of the values that are to be
+    added to the list.
+    """
+    def wrapper(func):
+        """
+        Set a flag on the method `func` so that when the method's class is
+        created the creater knows to register the method as a set many
+        callback.
+        """
+        _register_hook(func, Hook.set_many)
+        return func
+    return wrapper
+
+
+def remove_many_callback():
+    """
+    Method decorator that marks the method as a remove many callback. The
+    method is passed a sequence of indices and a sequence of the values at
+    those indices that are about to be removed. No return value is expected.
+    """
+    def wrapper(func):
+        """
+        Set a flag on the method `func` so that when the method's class is
+        created the creater knows to register the method as a remove many
+        callback.
+        """
+        _register_hook(func, Hook.remove_many)
+        return func
+    return wrapper
+
+
+def search_key_callback():
+    """
+    Method decorator that marks the method as a search key callback. The
+    method is passed a value, either an element of the list or a value being
+    searched for, and must return a hashable key. Searching the list
+    compares the keys of values rather than the values.
+    """
+    def wrapper(func):
+        """
+        Set a flag on the method `func` so that when the method's class is
+        created the creater knows to register the method as a search key
+        callback.
+        """
+        _register_hook(func, Hook.search_key)
+        return func
+    return wrapper
+
+
 def sort_callback():
     """
-    Method decorator that marks the method as a sort callback. No return value
-    is expected.
+    Method decorator that marks the method as a sort callback. Must return the
+    value the element is sorted by.
     """
     def wrapper(func):
         """
@@ -91,6 +161,24 @@ def sort_callback():
     return wrapper
 
 
+def sort_many_callback():
+    """
+    Method decorator that marks the method as a sort many callback. The method
+    is passed a sequence of indices and a sequence of the values at those
+    indices and must return a sequence of the values the elements are sorted
+    by.
+    """
+    def wrapper(func):
+        """
+        Set a flag on the method `func` so that when the method's class is
+        created the creater knows to register the method as a sort many
+        callback.
+        """
+        _register_hook(func, Hook.sort_many)
+        return func
+    return wrapper
+
+
 def begin_operation_callback():
     """
     Method decorator that marks the method as a begin operation callback. No
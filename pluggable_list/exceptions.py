@@ -78,3 +78,20 @@ class TooManyValues(IncorrectNumberOfValues):
     """
     Called when to many values are given for an operation.
     """
+
+
+class ModifiedDuringIteration(PluggableListException):
+    """
+    Raised when a pluggable list is modified while it is being iterated
+    over.
+    """
+
+
+class StorageFull(PluggableListException):
+    """
+    Raised when a change would make a list hold more elements than its
+    storage has room for.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        super().__init__()
@@ -0,0 +1,314 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+the index used to look up the positions of values in a pluggable list.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import bisect
+import threading
+
+
+class _SlotTree:
+    """
+    A Fenwick tree over numbered slots, each of which holds an element of a
+    sequence or has been emptied, that finds the position in the sequence
+    of the element in a slot and the slot of the element at a position in
+    time logarithmic in the number of slots. Slots are numbered in the
+    order of the elements they hold.
+    """
+    def __init__(self, size):
+        tree = [0] + [1] * size
+
+        for node in range(1, size + 1):
+            parent = node + (node & -node)
+            if parent <= size:
+                tree[parent] += tree[node]
+
+        self._tree = tree
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def append(self):
+        """
+        Add a slot holding an element after the last slot.
+        """
+        tree = self._tree
+        node = len(tree)
+        total = 1
+        child = node - 1
+        stop = node - (node & -node)
+
+        while child > stop:
+            total += tree[child]
+            child -= child & -child
+
+        tree.append(total)
+
+    def empty(self, slot):
+        """
+        Mark slot `slot` as no longer holding an element.
+        """
+        tree = self._tree
+        node = slot + 1
+
+        while node < len(tree):
+            tree[node] -= 1
+            node += node & -node
+
+    def position(self, slot):
+        """
+        Return the number of elements held in the slots before `slot`.
+        """
+        tree = self._tree
+        node = slot
+        total = 0
+
+        while node:
+            total += tree[node]
+            node -= node & -node
+
+        return total
+
+    def slot(self, position):
+        """
+        Return the slot holding the element at position `position`.
+        """
+        tree = self._tree
+        node = 0
+        step = 1 << (len(tree) - 1).bit_length()
+
+        while step:
+            if node + step < len(tree) and tree[node + step] <= position:
+                node += step
+                position -= tree[node]
+            step >>= 1
+
+        return node
+
+    def truncate(self, size):
+        """
+        Remove every slot after the first `size` slots.
+        """
+        del self._tree[size + 1:]
+
+
+class ValueIndex:
+    """
+    An index of the values in the sequence `data`, or of the keys returned
+    by the function `key` for them if it is given, that is kept up to date
+    by the journal of the list holding `data`. Values, or their keys, must
+    be hashable.
+
+    The index holds the slots of the elements equal to each value, and a
+    `_SlotTree` to turn slots into positions, so deletions, replacements
+    and changes at the end of the sequence are recorded in time
+    logarithmic in its length. The number of occurrences of each value is
+    always known. Insertions before the end lower a watermark to the first
+    position they affect: positions at or above the watermark are stale,
+    and only that part of the index is rebuilt the next time a value whose
+    first known position is not below the watermark is looked up. Readers
+    of a thread safe list share its lock, so lookups hold a lock of the
+    index's own while they may rebuild it.
+    """
+    def __init__(self, data, key=None):
+        self._data = data
+        self._key = key
+        self._lock = threading.Lock()
+        self.rebuild()
+
+    def _keys(self, values):
+        if self._key is None:
+            return list(values)
+        return [self._key(value) for value in values]
+
+    def rebuild(self):
+        """
+        Rebuild the index from the sequence.
+        """
+        counts = {}
+        slots = {}
+
+        for idx, value in enumerate(self._keys(self._data)):
+            counts[value] = counts.get(value, 0) + 1
+            slots.setdefault(value, []).append(idx)
+
+        self._counts = counts
+        self._slots = slots
+        self._tree = _SlotTree(len(self._data))
+        self._len = len(self._data)
+        self._valid = None
+        self._stale_values = set()
+
+    def _rebuild_from(self, start):
+        """
+        Rebuild the part of the index for the elements from position `start`.
+        """
+        if not start:
+            self.rebuild()
+            return
+
+        tree = self._tree
+        first_slot = tree.slot(start - 1) + 1
+        values = self._keys(self._data[start:])
+
+        for value in self._stale_values.union(values):
+            value_slots = self._slots.get(value)
+            if value_slots is not None:
+                del value_slots[bisect.bisect_left(value_slots, first_slot):]
+                if not value_slots:
+                    del self._slots[value]
+
+        tree.truncate(first_slot)
+
+        for slot, value in enumerate(values, first_slot):
+            tree.append()
+            self._slots.setdefault(value, []).append(slot)
+
+        self._valid = None
+        self._stale_values = set()
+
+    def _lower(self, idx):
+        if self._valid is None or idx < self._valid:
+            self._valid = idx
+
+    def _is_valid(self, idx):
+        return self._valid is None or idx < self._valid
+
+    def count(self, value):
+        """
+        Return the number of elements of the sequence equal to `value`.
+        """
+        value, = self._keys((value,))
+        try:
+            return self._counts.get(value, 0)
+        except TypeError:
+            return sum(1 for v in self._keys(self._data) if v == value)
+
+    def first(self, value):
+        """
+        Return the position of the first element of the sequence equal to
+        `value`, or None if there is no such element.
+        """
+        value, = self._keys((value,))
+        try:
+            if value not in self._counts:
+                return None
+        except TypeError:
+            for idx, in_value in enumerate(self._keys(self._data)):
+                if in_value == value:
+                    return idx
+            return None
+
+        with self._lock:
+            value_slots = self._slots.get(value)
+
+            if value_slots:
+                idx = self._tree.position(value_slots[0])
+                if self._is_valid(idx):
+                    return idx
+
+            self._rebuild_from(self._valid)
+            return self._tree.position(self._slots[value][0])
+
+    def inserted(self, indices, values):
+        """
+        Record that `values` were inserted at the ascending indices
+        `indices`.
+        """
+        values = self._keys(values)
+        counts = self._counts
+
+        for value in values:
+            hash(value)
+
+        for value in values:
+            counts[value] = counts.get(value, 0) + 1
+
+        at_end = indices.step == 1 and indices[0] == self._len
+        self._len += len(values)
+
+        if not at_end:
+            self._lower(indices[0])
+        elif self._valid is None:
+            for value in values:
+                self._slots.setdefault(value, []).append(len(self._tree))
+                self._tree.append()
+
+    def deleted(self, indices, values):
+        """
+        Record that `values` were deleted from the ascending indices
+        `indices`.
+        """
+        values = self._keys(values)
+        counts = self._counts
+
+        for value in values:
+            counts[value] -= 1
+            if not counts[value]:
+                del counts[value]
+
+        self._len -= len(values)
+
+        # delete from the end so the positions of the others do not change
+        for idx, value in zip(reversed(indices), reversed(values)):
+            if self._is_valid(idx):
+                slot = self._tree.slot(idx)
+                self._tree.empty(slot)
+                value_slots = self._slots[value]
+                del value_slots[bisect.bisect_left(value_slots, slot)]
+                if not value_slots:
+                    del self._slots[value]
+                if self._valid is not None:
+                    self._valid -= 1
+            else:
+                self._stale_values.add(value)
+
+        # once most slots are empty the index is rebuilt to reclaim them
+        if len(self._tree) > 2 * self._len + 64:
+            self._lower(0)
+
+    def replaced(self, idx, old_value, new_value):
+        """
+        Record that the element at index `idx` was replaced.
+        """
+        old_value, new_value = self._keys((old_value, new_value))
+        hash(new_value)
+        counts = self._counts
+
+        counts[new_value] = counts.get(new_value, 0) + 1
+        counts[old_value] -= 1
+        if not counts[old_value]:
+            del counts[old_value]
+
+        if self._is_valid(idx):
+            slot = self._tree.slot(idx)
+            value_slots = self._slots[old_value]
+            del value_slots[bisect.bisect_left(value_slots, slot)]
+            if not value_slots:
+                del self._slots[old_value]
+            bisect.insort(self._slots.setdefault(new_value, []), slot)
+        else:
+            self._stale_values.add(old_value)
+
+    def reordered(self):
+        """
+        Record that the elements were reordered.
+        """
+        self._lower(0)
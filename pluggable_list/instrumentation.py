@@ -0,0 +1,202 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+the optional instrumentation of pluggable list classes, which records how
+often callbacks and operations run and how long they take.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from . import constants
+
+
+# the public methods of pluggable lists that are timed as operations; only
+# the creation of the iterator is timed for __iter__
+OPERATIONS = (
+    '__init__', '__getitem__', '__setitem__', '__delitem__', '__contains__',
+    '__iter__', 'append', 'extend', 'insert', 'pop', 'remove', 'clear',
+    'index', 'count', 'reverse', 'sort', 'add', 'update', 'copy',
+)
+
+# the ids of the lists each thread is timing an operation on, so operations
+# that call others, or call the method they override, are recorded once
+_TIMING = threading.local()
+
+# the upper bounds in seconds of the buckets of a latency histogram; the
+# last bucket has no upper bound
+BUCKET_BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+
+class Histogram:
+    """
+    Counts how many latencies fall into each of the buckets bounded by
+    `BUCKET_BOUNDS`, and their total.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def as_dict(self):
+        """
+        Return a dictionary of the number of latencies, their total in
+        seconds and a list of the number in each bucket.
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'buckets': list(self.buckets),
+        }
+
+
+class Stats:
+    """
+    Records the latencies of callbacks, keyed by hook, and of operations,
+    keyed by method name, the number of bytes journals save to be able to
+    undo changes and the number of rollbacks performed.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Discard everything recorded.
+        """
+        with self._lock:
+            self._hooks = {}
+            self._operations = {}
+            self._journal_bytes = 0
+            self._rollbacks = 0
+
+    def record_hook(self, hook, seconds):
+        with self._lock:
+            self._hooks.setdefault(hook, Histogram()).add(seconds)
+
+    def record_operation(self, name, seconds):
+        with self._lock:
+            self._operations.setdefault(name, Histogram()).add(seconds)
+
+    def record_journal(self, nbytes):
+        with self._lock:
+            self._journal_bytes += nbytes
+
+    def record_rollback(self):
+        with self._lock:
+            self._rollbacks += 1
+
+    def as_dict(self):
+        """
+        Return a dictionary of everything recorded. The histograms of
+        callbacks are keyed by hook name under 'hooks' and those of
+        operations by method name under 'operations'.
+        """
+        with self._lock:
+            return {
+                'hooks': {
+                    hook.name: histogram.as_dict()
+                    for hook, histogram in self._hooks.items()
+                },
+                'operations': {
+                    name: histogram.as_dict()
+                    for name, histogram in self._operations.items()
+                },
+                'journal_bytes': self._journal_bytes,
+                'rollbacks': self._rollbacks,
+                'bucket_bounds': list(BUCKET_BOUNDS),
+            }
+
+    def time_callback(self, hook, callback_func):
+        """
+        Return a function that invokes `callback_func`, the callback for
+        hook `hook`, and records how long it took.
+        """
+        @functools.wraps(callback_func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return callback_func(*args, **kwargs)
+            finally:
+                self.record_hook(hook, time.perf_counter() - start)
+
+        timed.timed_callback = True
+        return timed
+
+
+def original_callback(callback_func):
+    """
+    Return the callback `callback_func` was made from by `Stats.time_callback`,
+    or `callback_func` if it is not timed, so a subclass inheriting a timed
+    callback does not record its calls in the stats of its base class.
+    """
+    if getattr(callback_func, 'timed_callback', False):
+        return callback_func.__wrapped__
+    return callback_func
+
+
+def _time_operation(name, func):
+    @functools.wraps(func)
+    def timed(self, *args, **kwargs):
+        stats = getattr(type(self), constants.CONTROL_ATTR).get_stats()
+
+        try:
+            timing = _TIMING.lists
+        except AttributeError:
+            timing = _TIMING.lists = set()
+
+        if stats is None or id(self) in timing:
+            return func(self, *args, **kwargs)
+
+        timing.add(id(self))
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            stats.record_operation(name, time.perf_counter() - start)
+            timing.discard(id(self))
+
+    timed.timed_operation = True
+    return timed
+
+
+def instrument_class(list_cls):
+    """
+    Replace the methods of `list_cls` named in `OPERATIONS` with ones that
+    record how long they take in the stats of the class. An operation
+    called while another is being timed on the same list in the same thread
+    is part of the outer operation and not recorded separately. Methods that
+    are already instrumented and coroutine functions are left alone.
+    """
+    for name in OPERATIONS:
+        func = getattr(list_cls, name, None)
+
+        if (not inspect.isfunction(func) or
+                getattr(func, 'timed_operation', False) or
+                inspect.iscoroutinefunction(func)):
+            continue
+
+        setattr(list_cls, name, _time_operation(name, func))
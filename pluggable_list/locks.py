@@ -0,0 +1,105 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+the locks used to make pluggable lists safe to share between threads.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import threading
+
+
+class ReadWriteLock:
+    """
+    A lock that can be held by any number of readers or by one writer.
+    Waiting writers are given priority over new readers. The lock is
+    reentrant: a thread that holds it may acquire it again for reading,
+    and a writer may acquire it again for writing, but a reader may not
+    acquire it for writing.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}
+        self._writer = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """
+        Acquire the lock for reading, blocking until no writer holds or is
+        waiting for it, and return a function that releases it.
+        """
+        me = threading.get_ident()
+
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return self._release_write
+
+            if me not in self._readers:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+
+            self._readers[me] = self._readers.get(me, 0) + 1
+            return self._release_read
+
+    def acquire_write(self):
+        """
+        Acquire the lock for writing, blocking until no other thread holds
+        it, and return a function that releases it. Raises RuntimeError if
+        the calling thread holds the lock for reading.
+        """
+        me = threading.get_ident()
+
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return self._release_write
+
+            if me in self._readers:
+                raise RuntimeError(
+                    'cannot acquire a lock for writing while holding it for '
+                    'reading'
+                )
+
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+
+            self._writer = me
+            self._writer_depth = 1
+            return self._release_write
+
+    def _release_read(self):
+        me = threading.get_ident()
+
+        with self._cond:
+            self._readers[me] -= 1
+            if not self._readers[me]:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def _release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
@@ -0,0 +1,291 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+a harness that uses tracemalloc to measure the memory allocated by the
+public methods of pluggable lists with different callbacks. Run it with
+
+    python -m pluggable_list.memprofile --help
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import collections
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from . import bench
+from .bases import PluggableList
+
+
+SIZES = (10 ** 2, 10 ** 4)
+
+# allocations made by tracemalloc and this harness are left out of the
+# allocation sites reported
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def _package_site(traceback):
+    """
+    Return the innermost frame of `traceback` in this package, or the
+    innermost frame if there is none.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+
+    for frame in reversed(traceback):
+        if frame.filename.startswith(package_dir):
+            return frame
+
+    return traceback[-1]
+
+
+def profile(list_cls, name, size, top=0):
+    """
+    Run benchmark `name`, or create a list if `name` is 'init', for a list
+    of class `list_cls` with `size` elements while tracing allocations.
+    Return a dictionary of the peak number of bytes allocated while it ran,
+    the number of bytes a full garbage collection then releases, which are
+    held by reference cycles or the free lists of the interpreter, the
+    number of objects in reference cycles it finds, the number of bytes and
+    memory blocks still allocated after that, and the `top` allocation
+    sites, in this package where possible, that hold the most of those
+    bytes.
+
+    The benchmark is run once untraced first so caches, indexes and other
+    state created on first use are not counted. The garbage collector is
+    disabled while it runs.
+    """
+    values = list(range(size))
+
+    if name == 'init':
+        def operate(obj):
+            return list_cls(values)
+    else:
+        func = bench.BENCHMARKS[name][0]
+
+        def operate(obj):
+            func(obj, size)
+
+    operate(bench.new_list(list_cls, values))
+    obj = bench.new_list(list_cls, values)
+    gc.collect()
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    tracemalloc.start(25 if top else 1)
+    try:
+        result = operate(obj)
+        del result
+        current, peak = tracemalloc.get_traced_memory()
+        cyclic_objects = gc.collect()
+        collected = current - tracemalloc.get_traced_memory()[0]
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    finally:
+        tracemalloc.stop()
+        if gc_enabled:
+            gc.enable()
+
+    traces = snapshot.traces
+    sites = {}
+
+    for trace in traces:
+        frame = _package_site(trace.traceback)
+        site = '{}:{}'.format(os.path.basename(frame.filename), frame.lineno)
+        sites[site] = sites.get(site, 0) + trace.size
+
+    return {
+        'peak': peak,
+        'collected': collected,
+        'cyclic_objects': cyclic_objects,
+        'retained': sum(trace.size for trace in traces),
+        'retained_blocks': len(traces),
+        'sites': sorted(sites.items(), key=lambda item: -item[1])[:top],
+    }
+
+
+def instance_size(list_cls, count, size=3):
+    """
+    Return the mean number of bytes allocated for each of `count` lists of
+    class `list_cls` with `size` elements, including their elements.
+    """
+    values = list(range(size))
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        objs = [list_cls(values) for _ in range(count)]
+        allocated = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del objs
+    return allocated / count
+
+
+class _DictPluggableList(PluggableList):
+    """
+    A pluggable list whose instances have a `__dict__`, as those of
+    subclasses that do not define `__slots__` do.
+    """
+
+
+def instance_sizes(count, size=3):
+    """
+    Return an ordered dictionary of the mean number of bytes allocated for
+    each of `count` lists with `size` elements keyed by the kind of list: a
+    built-in list, a pluggable list and a pluggable list with a `__dict__`.
+    """
+    return collections.OrderedDict(
+        (label, instance_size(list_cls, count, size))
+        for label, list_cls in (
+            ('list', list),
+            ('slots', bench.make_list_class(())),
+            ('dict', _DictPluggableList),
+        )
+    )
+
+
+def run(sizes=SIZES, hooks=None, benchmarks=None, top=0, report=None):
+    """
+    Profile the benchmarks named in `benchmarks`, or all of them, for lists
+    of each size in `sizes` with each of the hook combinations returned by
+    `bench.hook_sets(hooks)`, and return a list of result dictionaries.
+    Each result holds the figures returned by `profile` and the peak
+    divided by the number of operations performed and by the number of
+    elements in the list. If `report` is given it is called with each
+    result as it is produced.
+    """
+    if benchmarks is None:
+        benchmarks = list(bench.BENCHMARKS) + ['init']
+
+    results = []
+
+    for label, hook_names in bench.hook_sets(hooks).items():
+        list_cls = bench.make_list_class(
+            hook_names, bench.OPTION_SETS.get(label)
+        )
+
+        for size in sizes:
+            for name in benchmarks:
+                result = profile(list_cls, name, size, top)
+                result.update(
+                    benchmark=name, size=size, hooks=label,
+                    peak_per_op=result['peak'] / bench.operations(name, size),
+                    peak_per_element=result['peak'] / size
+                )
+                results.append(result)
+
+                if report is not None:
+                    report(result)
+
+    return results
+
+
+def _print_result(result):
+    print('{:<14} {:>8} {:<10} {:>9} {:>9.1f} {:>9.1f} {:>9} {:>7} {:>8}'.format(
+        result['benchmark'], result['size'], result['hooks'], result['peak'],
+        result['peak_per_op'], result['peak_per_element'], result['collected'],
+        result['cyclic_objects'], result['retained']
+    ))
+    for site, nbytes in result['sites']:
+        print('    {:<40} {:>10}'.format(site, nbytes))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m pluggable_list.memprofile',
+        description='Measure the memory allocated by the methods of pluggable '
+                    'lists.'
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(SIZES),
+        help='list sizes to profile'
+    )
+    parser.add_argument(
+        '--hooks', nargs='+', choices=sorted(bench.hook_sets()),
+        help='hook combinations to profile (default: all)'
+    )
+    parser.add_argument(
+        '--benchmarks', nargs='+',
+        choices=sorted(list(bench.BENCHMARKS) + ['init']),
+        help='benchmarks to profile (default: all)'
+    )
+    parser.add_argument(
+        '--top', type=int, default=0,
+        help='number of allocation sites holding retained memory to show'
+    )
+    parser.add_argument(
+        '--instances', type=int, metavar='COUNT',
+        help='report the bytes used by each of COUNT small lists instead'
+    )
+    parser.add_argument('--save', metavar='PATH', help='save results as JSON')
+    parser.add_argument(
+        '--compare', metavar='PATH',
+        help='compare results with a baseline saved with --save'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=1.1,
+        help='growth in peak memory relative to the baseline reported as a '
+             'regression'
+    )
+    args = parser.parse_args(argv)
+
+    if args.instances:
+        print('{:<8} {:>8} {:>12}'.format('list', 'size', 'bytes/list'))
+        for size in args.sizes:
+            for label, nbytes in instance_sizes(args.instances, size).items():
+                print('{:<8} {:>8} {:>12.1f}'.format(label, size, nbytes))
+        return 0
+
+    print('{:<14} {:>8} {:<10} {:>9} {:>9} {:>9} {:>9} {:>7} {:>8}'.format(
+        'benchmark', 'size', 'hooks', 'peak', 'peak/op', 'peak/elem',
+        'collected', 'cyclic', 'retained'
+    ))
+    results = run(args.sizes, args.hooks, args.benchmarks, args.top, _print_result)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as save_file:
+            json.dump(
+                {'python': sys.version, 'results': results}, save_file, indent=2
+            )
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+        regressions = bench.compare(results, baseline, args.threshold, 'peak')
+
+        for result, old in regressions:
+            print('regression: {} size {} hooks {}: peak {}, was {}'.format(
+                result['benchmark'], result['size'], result['hooks'],
+                result['peak'], old['peak']
+            ))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
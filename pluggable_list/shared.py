@@ -0,0 +1,364 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+a storage backend that holds the elements of a list in shared memory so
+several processes can use the same list. Requires Python 3.8 or later and
+a POSIX system.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import array
+import collections.abc
+import fcntl
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing import shared_memory
+from . import exceptions, constants, locks, storage
+
+
+# the length of the sequence is held in the first bytes of the block
+HEADER_SIZE = 8
+
+
+def _lock_path(name):
+    return os.path.join(tempfile.gettempdir(), '{}.lock'.format(name.lstrip('/')))
+
+
+def _open_block(name):
+    """
+    Attach to the existing shared memory block `name`. From Python 3.13 the
+    resource tracker of this process is told not to destroy the block when
+    the process exits; before then processes attaching to a block should
+    share the resource tracker of the process that created it, as those
+    started by `multiprocessing` from it do.
+    """
+    if sys.version_info >= (3, 13):
+        # the keyword is missing from the signature of older versions
+        # pylint: disable=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name, track=False)
+    return shared_memory.SharedMemory(name)
+
+
+class ProcessReadWriteLock:
+    """
+    A `locks.ReadWriteLock` that also excludes other processes, by holding
+    a shared or exclusive `flock` on the file at `path` while any thread of
+    this process holds the lock.
+    """
+    def __init__(self, path):
+        self._path = path
+        self._local = locks.ReadWriteLock()
+        self._mutex = threading.Lock()
+        self._holds = 0
+        self._pid = None
+        self._fd = None
+
+    def _file(self):
+        # flock locks are shared by processes that inherit the descriptor,
+        # so a forked process must open the file again
+        if self._pid != os.getpid():
+            self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._fd
+
+    def _acquire(self, release_local, operation):
+        try:
+            with self._mutex:
+                if not self._holds:
+                    fcntl.flock(self._file(), operation)
+                self._holds += 1
+        except:
+            release_local()
+            raise
+
+        def release():
+            with self._mutex:
+                self._holds -= 1
+                if not self._holds:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            release_local()
+
+        return release
+
+    def acquire_read(self):
+        """
+        Acquire the lock for reading and return a function that releases it.
+        """
+        return self._acquire(self._local.acquire_read(), fcntl.LOCK_SH)
+
+    def acquire_write(self):
+        """
+        Acquire the lock for writing and return a function that releases it.
+        """
+        return self._acquire(self._local.acquire_write(), fcntl.LOCK_EX)
+
+    def close(self):
+        """
+        Close the lock file.
+        """
+        if self._pid == os.getpid():
+            os.close(self._fd)
+        self._pid = self._fd = None
+
+
+class SharedArray(collections.abc.MutableSequence):
+    """
+    A mutable sequence of fixed width numbers with the `array.array` type
+    code `typecode`, held in the shared memory block `block` after a header
+    holding its length. Elements are read from and written to the block in
+    place; slices are returned as `array.array` objects.
+
+    The `lock` attribute is the lock that operations on a list holding the
+    sequence hold, which excludes other processes attached to the block.
+    """
+    def __init__(self, block, typecode):
+        self._block = block
+        self.name = block.name
+        self.typecode = typecode
+        itemsize = array.array(typecode).itemsize
+        self.capacity = (block.size - HEADER_SIZE) // itemsize
+        self._length = block.buf[:HEADER_SIZE].cast('Q')
+        self._values = block.buf[
+            HEADER_SIZE:HEADER_SIZE + self.capacity * itemsize
+        ].cast(typecode)
+        self.lock = ProcessReadWriteLock(_lock_path(block.name))
+
+    def _view(self):
+        return self._values[:self._length[0]]
+
+    def _replace(self, start, stop, values):
+        """
+        Replace the elements from index `start` up to `stop` with the
+        elements of `values`.
+        """
+        values = self._as_array(values)
+        length = self._length[0]
+        new_length = length - (stop - start) + len(values)
+
+        if new_length > self.capacity:
+            raise exceptions.StorageFull(self.capacity)
+
+        end = start + len(values)
+        self._values[end:new_length] = self._values[stop:length]
+        self._values[start:end] = values
+        self._length[0] = new_length
+
+    def _as_array(self, values):
+        if isinstance(values, array.array) and values.typecode == self.typecode:
+            return values
+        return array.array(self.typecode, values)
+
+    def __len__(self):
+        return self._length[0]
+
+    def __iter__(self):
+        with self._view() as view:
+            yield from view
+
+    def __contains__(self, value):
+        with self._view() as view:
+            return value in view
+
+    def __getitem__(self, spec):
+        if isinstance(spec, slice):
+            return array.array(self.typecode, self._view()[spec].tobytes())
+        return self._view()[spec]
+
+    def __setitem__(self, spec, value):
+        if not isinstance(spec, slice):
+            self._view()[spec] = value
+            return
+
+        values = self._as_array(value)
+        indices = range(*spec.indices(len(self)))
+
+        if spec.step is not None and spec.step != 1:
+            if len(values) != len(indices):
+                raise ValueError(
+                    'attempt to assign sequence of size {} to extended slice '
+                    'of size {}'.format(len(values), len(indices))
+                )
+            self._view()[spec] = values
+        else:
+            self._replace(
+                indices.start, max(indices.start, indices.stop), values
+            )
+
+    def __delitem__(self, spec):
+        if not isinstance(spec, slice):
+            idx = len(self) + spec if spec < 0 else spec
+            if not 0 <= idx < len(self):
+                raise IndexError('index out of range')
+            self._replace(idx, idx + 1, ())
+            return
+
+        indices = range(*spec.indices(len(self)))
+
+        if spec.step is not None and spec.step != 1:
+            removed = set(indices)
+            kept = self._as_array(
+                value for idx, value in enumerate(self._view())
+                if idx not in removed
+            )
+            self._replace(0, len(self), kept)
+        else:
+            self._replace(
+                indices.start, max(indices.start, indices.stop), ()
+            )
+
+    def insert(self, idx, value):
+        length = len(self)
+        idx = max(idx + length, 0) if idx < 0 else min(idx, length)
+        self._replace(idx, idx, (value,))
+
+    def extend(self, values):
+        length = len(self)
+        self._replace(length, length, values)
+
+    def reverse(self):
+        values = self[:]
+        values.reverse()
+        self._view()[:] = values
+
+    def count(self, value):
+        with self._view() as view:
+            return sum(1 for element in view if element == value)
+
+    def index(self, value):
+        with self._view() as view:
+            for idx, element in enumerate(view):
+                if element == value:
+                    return idx
+
+        raise ValueError('{!r} is not in sequence'.format(value))
+
+    def tolist(self):
+        """
+        Return the elements of the sequence as a list.
+        """
+        return self._view().tolist()
+
+    def close(self):
+        """
+        Detach from the shared memory block. The sequence cannot be used
+        after it is closed.
+        """
+        self._length.release()
+        self._values.release()
+        self._block.close()
+        self.lock.close()
+
+    def unlink(self):
+        """
+        Destroy the shared memory block once every process has detached
+        from it.
+        """
+        self._block.unlink()
+        try:
+            os.unlink(_lock_path(self.name))
+        except FileNotFoundError:
+            pass
+
+
+class SharedMemoryStorage(storage.Storage):
+    """
+    Storage backend that holds elements of the fixed width numeric type
+    with the `array.array` type code `typecode` in a block of shared memory
+    with room for `capacity` elements. Other processes attach to the list
+    with `attach`, and operations on a list in any process hold a lock that
+    excludes operations on the list in every other process.
+
+    A change that would make a list hold more than `capacity` elements
+    raises `StorageFull`. Unpickling a list creates a new block holding a
+    copy of its elements.
+    """
+    shared = True
+
+    def __init__(self, typecode, capacity):
+        self.typecode = typecode
+        self.capacity = capacity
+
+    def create(self, values=()):
+        itemsize = array.array(self.typecode).itemsize
+        block = shared_memory.SharedMemory(
+            create=True, size=HEADER_SIZE + self.capacity * itemsize
+        )
+        data = SharedArray(block, self.typecode)
+        data.extend(values)
+        return data
+
+    def attach(self, name):
+        """
+        Return a sequence holding the elements in the shared memory block
+        `name`, created by this backend in any process.
+        """
+        return SharedArray(_open_block(name), self.typecode)
+
+    def as_list(self, data):
+        return data.tolist()
+
+    def sort(self, data, key=None, reverse=False):
+        data[:] = array.array(
+            self.typecode, sorted(data, key=key, reverse=reverse)
+        )
+
+    def lock(self, data):
+        return data.lock
+
+    def dump(self, data, protocol):
+        return data[:]
+
+
+def shared_name(pl_obj):
+    """
+    Return the name of the shared memory block holding the elements of
+    `pl_obj`, which other processes pass to `attach`.
+    """
+    return getattr(pl_obj, constants.DATA_ATTR).name
+
+
+def attach(list_cls, name):
+    """
+    Return a new instance of `list_cls`, whose storage backend must be a
+    SharedMemoryStorage, holding the elements in the shared memory block
+    `name`. The instance is not initialised and no callbacks are invoked.
+    """
+    ctl = getattr(list_cls, constants.CONTROL_ATTR)
+    storage_backend = ctl.get_storage()
+
+    if not isinstance(storage_backend, SharedMemoryStorage):
+        raise TypeError('{} does not use shared memory'.format(list_cls.__name__))
+
+    pl_obj = list_cls.__new__(list_cls)
+    setattr(pl_obj, constants.DATA_ATTR, storage_backend.attach(name))
+    return pl_obj
+
+
+def detach(pl_obj, unlink=False):
+    """
+    Detach `pl_obj` from the shared memory block holding its elements, and
+    destroy the block if `unlink` is true. The process that created a list
+    should destroy its block once every process has finished with it.
+    """
+    data = getattr(pl_obj, constants.DATA_ATTR)
+    data.close()
+
+    if unlink:
+        data.unlink()
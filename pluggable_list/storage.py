@@ -0,0 +1,137 @@
+"""
+This file is part of the Python module "pluggable_list" and implements
+the storage backends that hold the elements of a pluggable list.
+
+
+Copyright (C) 2016 Aubrey Stark-Toller <aubrey@deepearth.uk>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import abc
+import array
+import pickle
+
+
+class Storage(abc.ABC):
+    """
+    Base for storage backends. A storage backend creates the mutable sequence
+    that holds the elements of a pluggable list and implements the
+    operations on that sequence that are not common to all mutable
+    sequences.
+
+    Backends must implement `create`, `as_list` and `sort`; one that does
+    not cannot be instantiated. A backend whose sequences are shared with
+    other processes sets `shared` to true and implements `lock`.
+    """
+    shared = False
+
+    @abc.abstractmethod
+    def create(self, values=()):
+        """
+        Return a new sequence holding the values yielded by `values`.
+        """
+
+    @abc.abstractmethod
+    def as_list(self, data):
+        """
+        Return `data`, a sequence created by slicing a sequence created by
+        this backend, as a list.
+        """
+
+    @abc.abstractmethod
+    def sort(self, data, key=None, reverse=False):
+        """
+        Sort the sequence `data` in place.
+        """
+
+    def lock(self, data):
+        """
+        Return the lock, with the same interface as `locks.ReadWriteLock`,
+        that operations on a list whose elements are held in the sequence
+        `data` must hold, or None if they do not need one.
+        """
+        return None
+
+    def dump(self, data, protocol):
+        """
+        Return an object that can be pickled with pickle protocol `protocol`
+        holding the elements of the sequence `data`, from which `load`
+        creates a new sequence. The object must not change when `data`
+        changes size.
+        """
+        return list(data)
+
+    def load(self, state):
+        """
+        Return a new sequence holding the elements held by `state`, an
+        object returned by `dump` or an unpickled copy of one. The sequence
+        may take ownership of `state`.
+        """
+        return self.create(state)
+
+
+class ListStorage(Storage):
+    """
+    Storage backend that holds elements in a list. This is the default
+    storage backend.
+    """
+    def create(self, values=()):
+        return list(values)
+
+    def as_list(self, data):
+        return data
+
+    def sort(self, data, key=None, reverse=False):
+        data.sort(key=key, reverse=reverse)
+
+    def load(self, state):
+        return state
+
+
+class ArrayStorage(Storage):
+    """
+    Storage backend that holds elements in an `array.array` with type code
+    `typecode`, storing numeric elements unboxed.
+    """
+    def __init__(self, typecode):
+        self.typecode = typecode
+
+    def create(self, values=()):
+        return array.array(self.typecode, values)
+
+    def as_list(self, data):
+        return data.tolist()
+
+    def sort(self, data, key=None, reverse=False):
+        data[:] = self.create(sorted(data, key=key, reverse=reverse))
+
+    def dump(self, data, protocol):
+        # with protocol 5 the bytes of the elements can be passed out-of-band
+        # rather than written into the pickle. The buffer is over a copy, as
+        # an array cannot change size while its memory is exported and a
+        # consumer may hold the buffer after the pickle is made; `load`
+        # copies it again because an array cannot adopt external memory
+        if protocol >= 5 and hasattr(pickle, 'PickleBuffer'):
+            return pickle.PickleBuffer(data.tobytes())
+        return self.create(data)
+
+    def load(self, state):
+        if isinstance(state, array.array):
+            return state
+
+        data = self.create()
+        data.frombytes(memoryview(state).cast('B'))
+        return data
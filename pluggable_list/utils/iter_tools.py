@@ -53,11 +53,14 @@ def insertions(list_len, start, step, iterable_obj):
             if remaining != 0:
                 raise TooManyValues(count + remaining)
             else:
-                raise StopIteration()
+                return
         else:
             current_idx = idx
-            # it's fine if this raises StopIteration
-            value = next(iterator)
+
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
 
             count += 1
             list_len += 1
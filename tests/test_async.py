@@ -0,0 +1,192 @@
+"""
+Test asynchronous pluggable lists.
+"""
+
+import asyncio
+import pytest
+from pluggable_list import (
+    AsyncPluggableList, get_callback, set_callback, remove_callback,
+    get_many_callback, begin_operation_callback, end_operation_callback,
+    revert_callback
+)
+from pluggable_list.constants import DATA_ATTR
+from pluggable_list.exceptions import ModifiedDuringIteration
+
+
+l = pytest.pluggable_list
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AsyncList(AsyncPluggableList, async_concurrency=3):
+    """
+    An asynchronous pluggable list with coroutine callbacks that refuses
+    the value 'X' and records the greatest number of set callbacks running
+    at once and the operations begun, ended and reverted.
+    """
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.ops = []
+        super().__init__()
+
+    @set_callback()
+    async def set_cb(self, hook, proxy, idx, value):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.001 * (idx % 3))
+        self.running -= 1
+        if value == 'X':
+            raise ValueError()
+        return value + str(idx)
+
+    @get_callback()
+    async def get_cb(self, hook, proxy, idx, value):
+        await asyncio.sleep(0)
+        return value.upper()
+
+    @remove_callback()
+    def remove_cb(self, hook, proxy, idx, value):
+        return value
+
+    @begin_operation_callback()
+    def begin_cb(self, hook, proxy, **kwargs):
+        self.ops.append('begin')
+
+    @end_operation_callback()
+    def end_cb(self, hook, proxy):
+        self.ops.append('end')
+
+    @revert_callback()
+    def revert_cb(self, hook, proxy):
+        self.ops.append('revert')
+
+
+class ChunkedAsyncList(AsyncList, iter_chunk_size=4):
+    pass
+
+
+class BatchAsyncList(AsyncPluggableList):
+    @get_many_callback()
+    async def get_many_cb(self, hook, proxy, indices, values):
+        return [value * 2 for value in values]
+
+
+def test_async_list():
+    async def scenario():
+        obj = AsyncList()
+        await obj.extend(l.lr(10))
+        await obj.append('k')
+        await obj.insert(-1, 'z')
+        await obj.set(0, 'y')
+        popped = await obj.pop(1)
+        return obj, popped, await obj.get(2), await obj.get(slice(-3, None))
+
+    obj, popped, item, items = run(scenario())
+    expected = [v + str(n) for n, v in enumerate(l.lr(10))]
+    expected[0] = 'y0'
+    expected.insert(10, 'z10')
+    expected.append('k10')
+    del expected[1]
+
+    assert popped == 'b1'
+    assert getattr(obj, DATA_ATTR) == expected
+    assert item == expected[2].upper()
+    assert items == [v.upper() for v in expected[-3:]]
+    assert len(obj) == len(expected)
+    assert obj.max_running == 3
+
+
+def test_async_iteration():
+    async def scenario(cls):
+        obj = cls()
+        await obj.extend(l.lr(10))
+        values = []
+        async for value in obj:
+            values.append(value)
+        return values
+
+    for cls in [AsyncList, ChunkedAsyncList]:
+        expected = [v.upper() + str(n) for n, v in enumerate(l.lr(10))]
+        assert run(scenario(cls)) == expected
+
+
+def test_async_modified_during_iteration():
+    async def scenario():
+        obj = ChunkedAsyncList()
+        await obj.extend(l.lr(10))
+        iter_obj = obj.__aiter__()
+        await iter_obj.__anext__()
+        await obj.append('k')
+        async for _ in iter_obj:
+            pass
+
+    with pytest.raises(ModifiedDuringIteration):
+        run(scenario())
+
+
+def test_async_failed_batch_is_reverted():
+    async def scenario():
+        obj = AsyncList()
+        await obj.extend(l.lr(3))
+        obj.ops = []
+        try:
+            await obj.extend(l.lr(5) + ['X'])
+        except ValueError:
+            pass
+        else:
+            assert False
+        return obj
+
+    obj = run(scenario())
+    assert getattr(obj, DATA_ATTR) == [v + str(n) for n, v in enumerate(l.lr(3))]
+    assert obj.ops == ['begin', 'revert', 'end']
+    assert obj.running == 0
+
+
+def test_async_batch_callbacks():
+    async def scenario():
+        obj = BatchAsyncList()
+        await obj.extend(l.lr(4))
+        return await obj.get(1), await obj.get(slice(None))
+
+    assert run(scenario()) == (l.lr(4)[1] * 2, [v * 2 for v in l.lr(4)])
+
+
+class IgnoringAsyncList(AsyncPluggableList):
+    @remove_callback()
+    async def remove_cb(self, hook, proxy, idx, value):
+        await asyncio.sleep(0)
+
+
+def test_async_pop_returns_element():
+    async def scenario():
+        obj = IgnoringAsyncList()
+        await obj.extend(l.lr(3))
+        return obj, await obj.pop(), await obj.pop(0)
+
+    obj, last, first = run(scenario())
+
+    assert (last, first) == ('c', 'a')
+    assert getattr(obj, DATA_ATTR) == ['b']
+
+
+@pytest.mark.parametrize("decorator", [
+    begin_operation_callback, end_operation_callback, revert_callback
+])
+def test_async_op_callback_rejected(decorator):
+    """
+    Test a class with a coroutine function as a callback invoked
+    synchronously by operations cannot be created.
+    """
+    with pytest.raises(TypeError):
+        class CoroutineOpList(AsyncPluggableList):
+            @decorator()
+            async def op_cb(self, hook, proxy, **kwargs):
+                pass
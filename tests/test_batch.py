@@ -0,0 +1,122 @@
+"""
+Test batch callbacks, which are invoked once with all the indices and values
+of a batch operation.
+"""
+
+import pytest
+from pluggable_list import (
+    get_many_callback, set_many_callback, remove_many_callback
+)
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import DATA_ATTR, Hook
+from pluggable_list.exceptions import IncorrectNumberOfValues
+
+
+l = pytest.pluggable_list
+
+
+class BatchList(PluggableList):
+    """
+    A pluggable list with batch callbacks that upper case values being added,
+    lower case values being fetched and record their invocations.
+    """
+    def __init__(self, *args, **kwargs):
+        self.registry = []
+        super().__init__(*args, **kwargs)
+
+    @get_many_callback()
+    def get_many_cb(self, hook, proxy, indices, values):
+        self.registry.append((hook, list(proxy), list(indices), list(values)))
+        return [v.lower() for v in values]
+
+    @set_many_callback()
+    def set_many_cb(self, hook, proxy, indices, values):
+        self.registry.append((hook, list(proxy), list(indices), list(values)))
+        return [v.upper() for v in values]
+
+    @remove_many_callback()
+    def remove_many_cb(self, hook, proxy, indices, values):
+        self.registry.append((hook, list(proxy), list(indices), list(values)))
+
+
+def test_init():
+    obj = BatchList(l.lr(3))
+    assert obj.registry == [(Hook.set_many, [], [0, 1, 2], ['a', 'b', 'c'])]
+    assert getattr(obj, DATA_ATTR) == ['A', 'B', 'C']
+
+
+def test_extend():
+    obj = BatchList(l.lr(2))
+    obj.extend('cd')
+    assert obj.registry[-1] == (Hook.set_many, ['A', 'B'], [2, 3], ['c', 'd'])
+    assert getattr(obj, DATA_ATTR) == ['A', 'B', 'C', 'D']
+
+
+def test_single_element_falls_back_to_batch():
+    obj = BatchList(l.lr(2))
+    obj.append('c')
+    obj.insert(0, 'z')
+    assert obj.registry[1:] == [
+        (Hook.set_many, ['A', 'B'], [2], ['c']),
+        (Hook.set_many, ['A', 'B', 'C'], [0], ['z']),
+    ]
+    assert obj[1] == 'a'
+    assert obj.registry[-1] == (Hook.get_many, ['Z', 'A', 'B', 'C'], [1], ['A'])
+
+
+def test_getitem_with_slice():
+    obj = BatchList(l.lr(5))
+    assert obj[::-2] == ['e', 'c', 'a']
+    assert obj.registry[-1] == (
+        Hook.get_many, ['A', 'B', 'C', 'D', 'E'], [4, 2, 0], ['E', 'C', 'A']
+    )
+
+
+def test_setitem_with_slice():
+    obj = BatchList(l.lr(5))
+    obj[1:3] = 'xyz'
+    assert obj.registry[1:] == [
+        (Hook.remove_many, ['A', 'B', 'C', 'D', 'E'], [1, 2], ['B', 'C']),
+        (Hook.set_many, ['A', 'D', 'E'], [1, 2, 3], ['x', 'y', 'z']),
+    ]
+    assert getattr(obj, DATA_ATTR) == ['A', 'X', 'Y', 'Z', 'D', 'E']
+
+
+@pytest.mark.parametrize(
+    "slice_params,indices",
+    [
+        ((None, None, None), [0, 1, 2, 3, 4]),
+        ((1, 4, None), [1, 2, 3]),
+        ((None, None, -2), [0, 2, 4]),
+    ]
+)
+def test_delitem_with_slice(slice_params, indices):
+    obj = BatchList(l.lr(5))
+    del obj[slice(*slice_params)]
+    data = ['A', 'B', 'C', 'D', 'E']
+    assert obj.registry[-1] == (
+        Hook.remove_many, data, indices, [data[idx] for idx in indices]
+    )
+
+
+def test_clear():
+    obj = BatchList(l.lr(3))
+    obj.clear()
+    assert obj.registry[-1] == (
+        Hook.remove_many, ['A', 'B', 'C'], [0, 1, 2], ['A', 'B', 'C']
+    )
+    assert getattr(obj, DATA_ATTR) == []
+
+
+def test_batch_size_mismatch():
+    class DroppingList(PluggableList):
+        @set_many_callback()
+        def set_many_cb(self, hook, proxy, indices, values):
+            return values[1:]
+
+    obj = DroppingList()
+
+    with pytest.raises(IncorrectNumberOfValues):
+        obj.extend(l.lr(3))
+
+    assert getattr(obj, DATA_ATTR) == []
@@ -0,0 +1,63 @@
+"""
+Test the benchmark suite.
+"""
+
+import json
+from pluggable_list import bench
+
+
+def test_run():
+    results = bench.run(
+        sizes=[10], hooks=['none', 'all'], benchmarks=['getitem', 'sort', 'init'],
+        repeat=1
+    )
+
+    assert [(r['benchmark'], r['hooks']) for r in results] == [
+        ('getitem', 'none'), ('sort', 'none'), ('init', 'none'),
+        ('getitem', 'all'), ('sort', 'all'), ('init', 'all'),
+    ]
+    assert all(r['seconds'] > 0 and r['list_seconds'] > 0 for r in results)
+
+
+def test_run_option_sets():
+    results = bench.run(
+        sizes=[10], hooks=['snapshot'], benchmarks=['getitem', 'append'],
+        repeat=1
+    )
+
+    assert [(r['benchmark'], r['hooks']) for r in results] == [
+        ('getitem', 'snapshot'), ('append', 'snapshot'),
+    ]
+    assert bench.make_list_class((), bench.OPTION_SETS['snapshot'])(
+        range(3)
+    )[:] == [0, 1, 2]
+
+
+def test_compare():
+    old = [{'benchmark': 'pop', 'size': 10, 'hooks': 'set', 'seconds': 1.0}]
+    new = [
+        {'benchmark': 'pop', 'size': 10, 'hooks': 'set', 'seconds': 1.5},
+        {'benchmark': 'pop', 'size': 10, 'hooks': 'get', 'seconds': 9.0},
+    ]
+
+    assert bench.compare(new, old, 1.25) == [(new[0], old[0])]
+    assert bench.compare(new, old, 2) == []
+
+
+def test_main_saves_and_compares(tmpdir):
+    path = str(tmpdir.join('baseline.json'))
+    args = ['--sizes', '10', '--hooks', 'set', '--benchmarks', 'append', '--repeat', '1']
+
+    assert bench.main(args + ['--save', path]) == 0
+
+    with open(path) as baseline_file:
+        results = json.load(baseline_file)['results']
+
+    assert [r['benchmark'] for r in results] == ['append']
+
+    for result in results:
+        result['seconds'] = 0
+    with open(path, 'w') as baseline_file:
+        json.dump({'results': results}, baseline_file)
+
+    assert bench.main(args + ['--compare', path]) == 1
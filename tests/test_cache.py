@@ -0,0 +1,165 @@
+"""
+Test caching of the values returned by get callbacks.
+"""
+
+import threading
+import pytest
+from pluggable_list import get_callback, get_many_callback, set_callback
+from pluggable_list.bases import PluggableList
+
+
+l = pytest.pluggable_list
+
+
+class CachedList(PluggableList, get_cache_size=20):
+    """
+    A pluggable list that upper cases fetched values, records the indices
+    of fetched values and caches them.
+    """
+    def __init__(self, *args, **kwargs):
+        self.fetched = []
+        super().__init__(*args, **kwargs)
+
+    @get_callback()
+    def get_cb(self, hook, proxy, idx, value):
+        self.fetched.append(idx)
+        return value.upper()
+
+
+class SmallCachedList(CachedList, get_cache_size=3):
+    pass
+
+
+class BatchCachedList(PluggableList, get_cache_size=20):
+    def __init__(self, *args, **kwargs):
+        self.fetched = []
+        super().__init__(*args, **kwargs)
+
+    @get_many_callback()
+    def get_many_cb(self, hook, proxy, indices, values):
+        self.fetched.extend(indices)
+        return [value.upper() for value in values]
+
+
+class RefusingCachedList(CachedList):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            raise ValueError()
+        return value
+
+
+def test_cache_disabled():
+    assert PluggableList(l.lr(3)).cache_stats() is None
+
+
+@pytest.mark.parametrize("cls", [CachedList, BatchCachedList])
+def test_cache_hits(cls):
+    """
+    Test a get callback is invoked once per element however often the
+    element is fetched.
+    """
+    obj = cls(l.lr(10))
+
+    assert obj[2] == l.lr(10)[2].upper()
+    assert obj[-8] == l.lr(10)[2].upper()
+    assert obj[1:4] == [v.upper() for v in l.lr(10)[1:4]]
+    assert list(obj) == [v.upper() for v in l.lr(10)]
+    assert list(obj) == [v.upper() for v in l.lr(10)]
+
+    assert sorted(obj.fetched) == list(range(10))
+    assert obj.cache_stats() == {
+        'hits': 15, 'misses': 10, 'evictions': 0, 'size': 10, 'capacity': 20
+    }
+
+
+def test_cache_evictions():
+    obj = SmallCachedList(l.lr(5))
+
+    for idx in [0, 1, 2, 0, 3, 1]:
+        obj[idx]
+
+    assert obj.fetched == [0, 1, 2, 3, 1]
+    assert obj.cache_stats()['evictions'] == 2
+    assert obj.cache_stats()['size'] == 3
+
+
+@pytest.mark.parametrize(
+    "func_name,args,refetched",
+    [
+        ('__setitem__', (4, 'z'), list(range(4, 10))),
+        ('__setitem__', (slice(2, 4), ['y', 'z']), list(range(2, 10))),
+        ('__delitem__', (6,), list(range(6, 9))),
+        ('insert', (3, 'z'), list(range(3, 11))),
+        ('append', ('z',), [10]),
+        ('extend', (['y', 'z'],), [10, 11]),
+        ('pop', (7,), list(range(7, 9))),
+        ('reverse', (), list(range(10))),
+        ('clear', (), []),
+    ]
+)
+def test_cache_invalidation(func_name, args, refetched):
+    """
+    Test modifying the list discards the cached values of the elements
+    whose position or value changed, and only those.
+    """
+    obj = CachedList(l.lr(10))
+    real_list = l.lr(10)
+    list(obj)
+    obj.fetched = []
+
+    getattr(obj, func_name)(*args)
+    getattr(real_list, func_name)(*args)
+    assert list(obj) == [v.upper() for v in real_list]
+    assert sorted(set(obj.fetched)) == refetched
+
+
+def test_cache_invalidation_on_rollback():
+    obj = RefusingCachedList(l.lr(5))
+    list(obj)
+
+    with pytest.raises(ValueError):
+        with obj.transaction():
+            obj.append('z')
+            obj[2] = 'y'
+            assert obj[2] == 'Y'
+            obj.append('X')
+
+    obj.fetched = []
+    assert list(obj) == [v.upper() for v in l.lr(5)]
+    assert obj.fetched == [2, 3, 4]
+
+
+class SafeCachedList(PluggableList, thread_safe=True, get_cache_size=8):
+    @get_callback()
+    def get_cb(self, hook, proxy, idx, value):
+        return value.upper()
+
+
+def test_concurrent_readers_share_cache():
+    """
+    Test readers holding the shared lock of a thread safe list at the same
+    time keep the cache consistent.
+    """
+    obj = SafeCachedList(l.lr(16))
+    errors = []
+
+    def read(offset):
+        try:
+            for count in range(2000):
+                idx = (count * 7 + offset) % 16
+                assert obj[idx] == l.lr(16)[idx].upper()
+        except Exception as exp:
+            errors.append(exp)
+
+    threads = [threading.Thread(target=read, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = obj.cache_stats()
+
+    assert not errors
+    assert stats['hits'] + stats['misses'] == 8000
+    assert stats['size'] <= 8
@@ -0,0 +1,421 @@
+"""
+Test that modifying operations are reverted when a callback raises an
+exception part way through the operation.
+"""
+
+import pytest
+from pluggable_list import (
+    set_callback, remove_callback, revert_callback, begin_operation_callback,
+    end_operation_callback
+)
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import CONTROL_ATTR, Hook
+from pluggable_list.control import DeletionProxy, InsertionProxy, Journal
+
+
+l = pytest.pluggable_list
+
+
+class RefusalError(Exception):
+    pass
+
+
+class RefusingList(PluggableList):
+    """
+    A pluggable list that refuses to add the value 'X', refuses to remove the
+    value 'R' and counts the number of times it has been reverted.
+    """
+    def __init__(self, *args, **kwargs):
+        self.reverts = 0
+        super().__init__(*args, **kwargs)
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            raise RefusalError()
+        return value
+
+    @remove_callback()
+    def remove_cb(self, hook, proxy, idx, value):
+        if value == 'R':
+            raise RefusalError()
+
+    @revert_callback()
+    def revert_cb(self, hook, proxy):
+        self.reverts += 1
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('append', ('X',)),
+        ('extend', (['A', 'B', 'X', 'C'],)),
+        ('insert', (2, 'X')),
+        ('__setitem__', (1, 'X')),
+        ('__setitem__', (slice(1, 3), ['A', 'X'])),
+        ('__setitem__', (slice(None, None, 2), ['A', 'B', 'X'])),
+    ]
+)
+def test_failed_set_is_reverted(func_name, args):
+    """
+    Test a failing set callback leaves the list as it was.
+    """
+    obj = RefusingList(l.lr(5))
+
+    with pytest.raises(RefusalError):
+        getattr(obj, func_name)(*args)
+
+    assert list(obj) == l.lr(5)
+    assert obj.reverts == 1
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('__delitem__', (slice(None, None),)),
+        ('__delitem__', (slice(1, None, 2),)),
+        ('__delitem__', (slice(None, None, -1),)),
+        ('__setitem__', (slice(1, None), ['A'])),
+        ('clear', ()),
+    ]
+)
+def test_failed_remove_is_reverted(func_name, args):
+    """
+    Test a failing remove callback leaves the list as it was.
+    """
+    seq = ['a', 'b', 'c', 'R', 'd', 'e']
+    obj = RefusingList(seq)
+
+    with pytest.raises(RefusalError):
+        getattr(obj, func_name)(*args)
+
+    assert list(obj) == seq
+    assert obj.reverts == 1
+
+
+def test_journal_rollback_to_mark():
+    """
+    Test a journal only undoes the changes made since the mark it is
+    rolled back to.
+    """
+    data = l.lr(5)
+    journal = Journal(data)
+
+    journal.append('f')
+    journal.delete(0)
+    mark = journal.mark()
+    journal.insert(1, 'X')
+    journal.replace(5, 'Y')
+    journal.delete(2)
+
+    journal.rollback(mark)
+    assert data == ['b', 'c', 'd', 'e', 'f']
+
+    journal.rollback()
+    assert data == l.lr(5)
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [('insert', (-1, 'x')), ('insert', (6, 'x')), ('delete', (-1,)),
+     ('delete', (5,)), ('replace', (-1, 'x')), ('replace', (5, 'x'))]
+)
+def test_journal_refuses_unnormalised_index(func_name, args):
+    """
+    Test a journal only accepts non-negative indices within the list.
+    """
+    data = l.lr(5)
+    journal = Journal(data)
+
+    with pytest.raises(IndexError):
+        getattr(journal, func_name)(*args)
+
+    assert data == l.lr(5)
+    assert journal.mark() == 0
+
+
+def test_plain_hooks():
+    """
+    Test a hook is only plain when neither it nor the operation callbacks
+    have a callback.
+    """
+    ctl = getattr(RefusingList, CONTROL_ATTR)
+    assert ctl.is_plain(Hook.get)
+    assert not ctl.is_plain(Hook.set)
+
+    class NotifyingList(PluggableList):
+        @end_operation_callback()
+        def end_cb(self, hook, proxy):
+            pass
+
+    assert not getattr(NotifyingList, CONTROL_ATTR).is_plain(Hook.get)
+
+
+def test_bind():
+    """
+    Test `bind` returns a function that invokes the callback, or None if
+    there's no callback for the hook.
+    """
+    obj = RefusingList(l.lr(3))
+    ctl = getattr(RefusingList, CONTROL_ATTR)
+
+    assert ctl.bind(obj, Hook.get) is None
+    assert ctl.bind(obj, Hook.set)(0, 'a') == 'a'
+
+    with pytest.raises(RefusalError):
+        ctl.bind(obj, Hook.set)(0, 'X')
+
+
+@pytest.mark.parametrize(
+    "slice_params",
+    [
+        (None, None, None),
+        (2, 7, None),
+        (1, None, 3),
+        (None, None, -2),
+        (8, 1, -3),
+        (3, 3, None),
+    ]
+)
+def test_journal_rollback_delete_range(slice_params):
+    """
+    Test a journal can undo the deletion of a range of indices.
+    """
+    data = l.lr(10)
+    journal = Journal(data)
+
+    journal.delete_range(range(*slice(*slice_params).indices(len(data))))
+    expected = l.lr(10)
+    del expected[slice(*slice_params)]
+    assert data == expected
+
+    journal.rollback()
+    assert data == l.lr(10)
+
+
+@pytest.mark.parametrize(
+    "indices,expected",
+    [
+        (range(2, 5), ['a', 'b', 'X', 'Y', 'Z', 'c', 'd']),
+        (range(4, 7), ['a', 'b', 'c', 'd', 'X', 'Y', 'Z']),
+        (range(0, 6, 2), ['X', 'a', 'Y', 'b', 'Z', 'c', 'd']),
+        (range(5, 0, -2), ['a', 'Z', 'b', 'Y', 'c', 'X', 'd']),
+    ]
+)
+def test_journal_rollback_insert_range(indices, expected):
+    """
+    Test a journal can undo the insertion of values at a range of indices.
+    """
+    data = l.lr(4)
+    journal = Journal(data)
+
+    journal.insert_range(indices, ['X', 'Y', 'Z'])
+    assert data == expected
+
+    journal.rollback()
+    assert data == l.lr(4)
+
+
+class NotifyingList(RefusingList):
+    """
+    A RefusingList that counts the operations begun and ended on it.
+    """
+    def __init__(self, *args, **kwargs):
+        self.begun = 0
+        self.ended = 0
+        super().__init__(*args, **kwargs)
+
+    @begin_operation_callback()
+    def begin_cb(self, hook, proxy, **kwargs):
+        self.begun += 1
+
+    @end_operation_callback()
+    def end_cb(self, hook, proxy):
+        self.ended += 1
+
+
+def test_transaction():
+    """
+    Test operations in a transaction share a single begin and end
+    operation.
+    """
+    obj = NotifyingList()
+
+    with obj.transaction():
+        for value in l.lr(5):
+            obj.append(value)
+        obj.insert(0, 'z')
+        assert obj[0] == 'z'
+
+    assert (obj.begun, obj.ended, obj.reverts) == (1, 1, 0)
+    assert list(obj) == ['z'] + l.lr(5)
+
+
+def test_failed_transaction_is_reverted():
+    """
+    Test all the changes made in a transaction are reverted if an exception
+    is raised, and that the revert callback is invoked once.
+    """
+    obj = NotifyingList(l.lr(3))
+
+    with pytest.raises(RefusalError):
+        with obj.transaction():
+            obj.extend(['d', 'e'])
+            del obj[0]
+            obj.clear()
+            obj.append('X')
+
+    assert list(obj) == l.lr(3)
+    assert obj.reverts == 1
+
+
+def test_failed_operation_in_transaction():
+    """
+    Test an operation that fails in a transaction only undoes its own
+    changes.
+    """
+    obj = NotifyingList(l.lr(3))
+
+    with obj.transaction():
+        obj.append('d')
+
+        with pytest.raises(RefusalError):
+            obj.extend(['e', 'X'])
+
+        obj.append('e')
+
+    assert list(obj) == l.lr(5)
+    assert obj.reverts == 0
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('append', ('f',)),
+        ('extend', (['f', 'g'],)),
+        ('insert', (0, 'f')),
+        ('__setitem__', (0, 'f')),
+        ('__setitem__', (slice(1, 3), ['f'])),
+        ('__delitem__', (0,)),
+        ('__delitem__', (slice(None, None, 2),)),
+        ('pop', (1,)),
+        ('clear', ()),
+        ('reverse', ()),
+    ]
+)
+@pytest.mark.parametrize("cls", [PluggableList, RefusingList])
+def test_version(cls, func_name, args):
+    """
+    Test the version of a list increases when it is modified, and not when
+    it is only fetched from.
+    """
+    obj = cls(l.lr(5))
+    version = obj.version()
+
+    list(obj)
+    obj[1:3]
+    assert obj.version() == version
+
+    getattr(obj, func_name)(*args)
+    assert obj.version() > version
+
+
+def test_version_is_restored():
+    """
+    Test the version of a list is restored when a failed operation is
+    reverted.
+    """
+    obj = RefusingList(l.lr(5))
+    version = obj.version()
+
+    with pytest.raises(RefusalError):
+        obj.extend(['f', 'g', 'X'])
+
+    assert obj.version() == version
+
+    with pytest.raises(RefusalError):
+        with obj.transaction():
+            obj.append('f')
+            assert obj.version() > version
+            obj.append('X')
+
+    assert obj.version() == version
+
+
+class CountingSequence(list):
+    """
+    A list that counts how many times its elements are read.
+    """
+    reads = 0
+
+    def __getitem__(self, spec):
+        self.reads += 1
+        return super().__getitem__(spec)
+
+    def __iter__(self):
+        raise AssertionError('the whole list was read')
+
+
+@pytest.mark.parametrize(
+    "indices",
+    [range(2, 9), range(1, 10, 3), range(8, 0, -2), range(9, -1, -1)]
+)
+def test_deletion_proxy(indices):
+    """
+    Test a deletion proxy presents the list as if elements were removed one
+    at a time, reading only the elements asked for.
+    """
+    data = CountingSequence(l.lr(10))
+    proxy = DeletionProxy(data, indices)
+
+    for removed in range(len(indices) + 1):
+        proxy.removed = removed
+        gone = set(indices[:removed])
+        expected = [v for idx, v in enumerate(l.lr(10)) if idx not in gone]
+
+        data.reads = 0
+        assert [proxy[idx] for idx in range(len(expected))] == expected
+        assert data.reads == len(expected)
+        assert proxy[-1:] == expected[-1:]
+
+        with pytest.raises(IndexError):
+            proxy[len(expected)]
+
+
+@pytest.mark.parametrize(
+    "indices",
+    [[2, 3, 4, 5], [0, 3, 6, 9], [10, 11, 12], [4, 4, 4], [6, 5, 4, 3], [9, 7, 5]]
+)
+def test_insertion_proxy(indices):
+    """
+    Test an insertion proxy presents the list as if values were inserted one
+    at a time, reading only the elements asked for.
+    """
+    values = ['v{}'.format(count) for count in range(len(indices))]
+    data = CountingSequence(l.lr(10))
+    proxy = InsertionProxy(data, indices, values)
+
+    for inserted in range(len(indices) + 1):
+        proxy.inserted = inserted
+        expected = l.lr(10)
+        for idx, value in zip(indices[:inserted], values):
+            expected.insert(idx, value)
+
+        data.reads = 0
+        assert [proxy[idx] for idx in range(len(expected))] == expected
+        assert data.reads == 10
+        assert proxy[-2:] == expected[-2:]
+
+        with pytest.raises(IndexError):
+            proxy[len(expected)]
+
+
+def test_journal_insert_range_refuses_wrong_number_of_values():
+    data = l.lr(5)
+    journal = Journal(data)
+
+    with pytest.raises(ValueError):
+        journal.insert_range(range(0, 6, 2), ['x', 'y'])
+
+    assert data == l.lr(5)
+    assert journal.mark() == 0
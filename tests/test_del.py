@@ -6,7 +6,8 @@ results from these tests.
 
 import string
 import pytest
-from pluggable_list.bases import DelMixin
+from pluggable_list import remove_callback, set_callback
+from pluggable_list.bases import DelMixin, PluggableList
 
 l = pytest.pluggable_list
 
@@ -116,3 +117,52 @@ def test_del_slice_callbacks(remove_list_constructor, slice_params, target_indic
     cbs = l.build_remove_cb_seq(seq, target_indices, shifting=True)
     with rig.assert_callbacks(cbs) as invoke:
         invoke('__delitem__', {'modify'}, slice(*slice_params))
+
+
+
+class CallbackList(PluggableList):
+    @remove_callback()
+    def remove_cb(self, hook, proxy, idx, value):
+        pass
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        return value
+
+
+@pytest.mark.parametrize("cls", [PluggableList, CallbackList])
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('__delitem__', (-3,)),
+        ('__delitem__', (2,)),
+        ('pop', (-3,)),
+        ('pop', (2,)),
+        ('__setitem__', (-3, 'x')),
+        ('__setitem__', (2, 'x')),
+    ]
+)
+def test_index_out_of_range(cls, func_name, args):
+    """
+    Test an index out of range raises IndexError and leaves the list
+    unchanged, with and without callbacks.
+    """
+    obj = cls(l.lr(2))
+
+    with pytest.raises(IndexError):
+        getattr(obj, func_name)(*args)
+
+    assert obj[:] == l.lr(2)
+
+
+def test_pop_empty_list():
+    with pytest.raises(IndexError):
+        PluggableList().pop()
+
+
+def test_pop_returns_element_with_remove_callback():
+    obj = CallbackList(l.lr(3))
+
+    assert obj.pop() == 'c'
+    assert obj.pop(0) == 'a'
+    assert obj[:] == ['b']
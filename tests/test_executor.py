@@ -0,0 +1,99 @@
+"""
+Test invoking get and set callbacks using an executor.
+"""
+
+import threading
+import pytest
+from pluggable_list import get_callback, set_callback
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import DATA_ATTR
+
+
+l = pytest.pluggable_list
+
+
+class ThreadedList(PluggableList, executor='thread', executor_workers=4,
+                   executor_chunk_size=2):
+    """
+    A pluggable list that invokes its callbacks in a thread pool, refuses
+    the value 'X' and records the threads its set callback ran in.
+    """
+    def __init__(self, *args, **kwargs):
+        self.threads = set()
+        super().__init__(*args, **kwargs)
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            raise ValueError()
+        self.threads.add(threading.get_ident())
+        return value + str(idx)
+
+    @get_callback()
+    def get_cb(self, hook, proxy, idx, value):
+        return value.upper()
+
+
+class ProcessList(PluggableList, executor='process', executor_workers=2):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        return value * 2
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('extend', (l.lr(5),)),
+        ('__setitem__', (slice(2, 5), l.lr(6))),
+        ('__setitem__', (slice(None, None, 2), l.lr(5))),
+    ]
+)
+def test_thread_executor(func_name, args):
+    obj = ThreadedList(l.lr(10))
+    real_list = [v + str(n) for n, v in enumerate(l.lr(10))]
+    assert getattr(obj, DATA_ATTR) == real_list
+
+    getattr(obj, func_name)(*args)
+
+    if func_name == 'extend':
+        real_list.extend(v + str(n) for n, v in enumerate(args[0], 10))
+    else:
+        spec = args[0]
+        indices = range(*spec.indices(len(real_list)))
+        if spec.step is None:
+            indices = range(indices.start, indices.start + len(args[1]))
+        real_list[spec] = [v + str(n) for n, v in zip(indices, args[1])]
+
+    assert getattr(obj, DATA_ATTR) == real_list
+    assert obj[:] == [v.upper() for v in real_list]
+    assert obj[3:7] == [v.upper() for v in real_list[3:7]]
+
+
+def test_thread_executor_uses_threads():
+    obj = ThreadedList(l.lr(20))
+    assert threading.get_ident() not in obj.threads
+
+
+def test_thread_executor_reverts():
+    obj = ThreadedList(l.lr(5))
+    data = list(getattr(obj, DATA_ATTR))
+
+    with pytest.raises(ValueError):
+        obj.extend(l.lr(7) + ['X'] + l.lr(3))
+
+    with pytest.raises(ValueError):
+        obj[1:3] = ['X'] * 6
+
+    assert getattr(obj, DATA_ATTR) == data
+
+
+def test_process_executor():
+    obj = ProcessList(range(10))
+    obj.extend(range(10, 15))
+    assert getattr(obj, DATA_ATTR) == [n * 2 for n in range(15)]
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        class BadList(PluggableList, executor='fibers'):
+            pass
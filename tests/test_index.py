@@ -0,0 +1,299 @@
+"""
+Test searching lists, with and without an index of their values.
+"""
+
+import random
+import threading
+import pytest
+from pluggable_list import set_callback, search_key_callback
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import INDEX_ATTR
+from pluggable_list.control import Journal
+from pluggable_list.index import ValueIndex
+
+
+l = pytest.pluggable_list
+
+
+class IndexedList(PluggableList, index_values=True):
+    pass
+
+
+class RefusingIndexedList(IndexedList):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            raise ValueError()
+        return value
+
+
+def elements():
+    return l.lr(6) + l.lr(4)
+
+
+def assert_index_consistent(obj, real_list):
+    """
+    Assert searching `obj` gives the same results as searching
+    `real_list` for every value in either.
+    """
+    for value in set(real_list) | set(obj) | {'missing'}:
+        assert (value in obj) == (value in real_list)
+        assert obj.count(value) == real_list.count(value)
+        if value in real_list:
+            assert obj.index(value) == real_list.index(value)
+
+
+@pytest.mark.parametrize("cls", [PluggableList, IndexedList])
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('__contains__', (l.lr(6)[2],)),
+        ('__contains__', ('missing',)),
+        ('__contains__', ([],)),
+        ('count', (l.lr(6)[1],)),
+        ('count', (l.lr(6)[5],)),
+        ('count', ('missing',)),
+        ('index', (l.lr(6)[3],)),
+        ('index', (l.lr(6)[5],)),
+        ('index', ('missing',)),
+        ('remove', (l.lr(6)[2],)),
+        ('remove', (l.lr(6)[5],)),
+        ('remove', ('missing',)),
+    ]
+)
+def test_search(cls, func_name, args):
+    rig = l.function_test_rig(cls, elements(), allowed_exceptions=[ValueError])
+    rig.assert_equiv(func_name, *args)
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('__setitem__', (4, 'z')),
+        ('__setitem__', (slice(1, 7, 2), ['x', 'y', 'z'])),
+        ('__setitem__', (slice(2, 4), ['y'] * 5)),
+        ('__delitem__', (6,)),
+        ('__delitem__', (slice(None, None, 3),)),
+        ('__delitem__', (slice(-3, None),)),
+        ('insert', (0, l.lr(6)[5])),
+        ('append', (l.lr(6)[0],)),
+        ('extend', (l.lr(3),)),
+        ('pop', (-1,)),
+        ('remove', (l.lr(6)[3],)),
+        ('reverse', ()),
+        ('clear', ()),
+    ]
+)
+def test_index_is_maintained(func_name, args):
+    """
+    Test the index is kept consistent with the list by each modification,
+    including after another modification has left positions stale.
+    """
+    obj = IndexedList(elements())
+    real_list = elements()
+
+    for obj_args in [args, args]:
+        try:
+            getattr(real_list, func_name)(*obj_args)
+        except (IndexError, ValueError):
+            continue
+        getattr(obj, func_name)(*obj_args)
+        assert_index_consistent(obj, real_list)
+        obj.insert(1, 'w')
+        real_list.insert(1, 'w')
+
+    assert_index_consistent(obj, real_list)
+
+
+def test_index_is_restored_by_rollback():
+    obj = RefusingIndexedList(elements())
+    real_list = elements()
+    obj.index(l.lr(6)[4])
+
+    with pytest.raises(ValueError):
+        with obj.transaction():
+            obj.remove(l.lr(6)[0])
+            obj.append('z')
+            obj[2] = 'y'
+            obj.reverse()
+            obj.extend(['y', 'X'])
+
+    assert_index_consistent(obj, real_list)
+
+
+def test_index_rejects_unhashable_values():
+    obj = IndexedList(l.lr(3))
+    obj.count('a')
+
+    with pytest.raises(TypeError):
+        obj.extend(['y', []])
+
+    assert list(obj) == l.lr(3)
+    assert_index_consistent(obj, l.lr(3))
+
+
+def test_index_observes_construction_and_clear():
+    """
+    Test the values a list is created with are indexed, so unhashable ones
+    are refused, and clearing the list empties its index.
+    """
+    with pytest.raises(TypeError):
+        IndexedList([[1], [2]])
+
+    obj = IndexedList(l.lr(3))
+    obj.count('a')
+    obj.clear()
+
+    assert obj.count('a') == 0
+    assert_index_consistent(obj, [])
+
+
+def test_index_disabled():
+    obj = PluggableList(l.lr(3))
+    obj.count(l.lr(3)[0])
+    assert not hasattr(obj, INDEX_ATTR)
+
+
+class CaselessList(PluggableList):
+    @search_key_callback()
+    def search_key_cb(self, hook, proxy, value):
+        return value.lower()
+
+
+class CaselessIndexedList(CaselessList, index_values=True):
+    pass
+
+
+@pytest.mark.parametrize("cls", [CaselessList, CaselessIndexedList])
+def test_search_key(cls):
+    obj = cls(['a', 'B', 'c', 'b', 'A'])
+
+    assert 'b' in obj
+    assert 'D' not in obj
+    assert obj.count('a') == 2
+    assert obj.index('b') == 1
+    assert obj.index('C') == 2
+
+    obj.remove('a')
+    assert list(obj) == ['B', 'c', 'b', 'A']
+    assert obj.index('a') == 3
+
+    with pytest.raises(ValueError):
+        obj.index('d')
+
+
+def test_index_under_random_modifications():
+    """
+    Test the index stays consistent through a long sequence of mixed
+    modifications and lookups.
+    """
+    rand = random.Random(4)
+    obj = IndexedList(elements())
+    real_list = elements()
+
+    for _ in range(400):
+        choice = rand.randrange(7)
+        value = rand.choice(l.lr(8))
+        idx = rand.randrange(-len(real_list) - 1, len(real_list) + 1)
+
+        if choice == 0:
+            args = ('insert', idx, value)
+        elif choice == 1:
+            args = ('append', value)
+        elif choice in (2, 3) and real_list:
+            args = ('remove', rand.choice(real_list))
+        elif choice == 4 and real_list:
+            args = ('__setitem__', idx % len(real_list), value)
+        elif choice == 5 and real_list:
+            args = ('__delitem__', slice(idx, None, rand.randrange(1, 4)))
+        else:
+            args = ('reverse',)
+
+        getattr(real_list, args[0])(*args[1:])
+        getattr(obj, args[0])(*args[1:])
+
+        if rand.randrange(3):
+            value = rand.choice(l.lr(8))
+            assert obj.count(value) == real_list.count(value)
+            if value in real_list:
+                assert obj.index(value) == real_list.index(value)
+
+    assert_index_consistent(obj, real_list)
+
+
+class CountingList(list):
+    """
+    A list that counts how many of its elements are read by iterating over
+    it or slicing it.
+    """
+    reads = 0
+
+    def __iter__(self):
+        self.reads += len(self)
+        return super().__iter__()
+
+    def __getitem__(self, spec):
+        value = super().__getitem__(spec)
+        if isinstance(spec, slice):
+            self.reads += len(value)
+        return value
+
+
+def test_removals_do_not_rescan():
+    """
+    Test repeatedly finding and deleting elements does not rescan the
+    sequence, as the index updates the positions it holds.
+    """
+    size = 2000
+    data = CountingList(value % 500 for value in range(size))
+    value_index = ValueIndex(data)
+    journal = Journal(data, (value_index,))
+    data.reads = 0
+
+    for value in range(0, 500, 2):
+        journal.delete(value_index.first(value))
+
+    assert data.reads == 0
+    assert [value_index.first(v) for v in (1, 3, 5)] == [0, 1, 2]
+    assert value_index.first(0) == data.index(0)
+
+    journal.insert(size // 2, 'x')
+    data.reads = 0
+    value_index.first(1)
+    assert data.reads == 0
+
+    assert value_index.first('x') == size // 2
+    assert 0 < data.reads <= size // 2
+
+
+class SafeIndexedList(PluggableList, thread_safe=True, index_values=True):
+    pass
+
+
+def test_concurrent_lookups_rebuild_once():
+    """
+    Test readers sharing the lock of a thread safe list can look up values
+    while the stale part of the index is rebuilt.
+    """
+    values = [value % 50 for value in range(2000)]
+    obj = SafeIndexedList(values)
+    errors = []
+
+    def look_up(offset):
+        try:
+            for count in range(200):
+                value = (count + offset) % 50
+                assert obj.index(value) == values.index(value)
+        except Exception as exp:
+            errors.append(exp)
+
+    for _ in range(5):
+        obj.insert(10, 'x')
+        values.insert(10, 'x')
+        threads = [threading.Thread(target=look_up, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert not errors
@@ -0,0 +1,116 @@
+"""
+Test the instrumentation of pluggable list classes.
+"""
+
+import pytest
+from pluggable_list import get_callback, set_callback
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import CONTROL_ATTR, Hook
+
+
+l = pytest.pluggable_list
+
+
+class InstrumentedList(PluggableList, instrument=True):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            raise ValueError()
+        return value
+
+    @get_callback()
+    def get_cb(self, hook, proxy, idx, value):
+        return value
+
+
+class InstrumentedSubList(InstrumentedList):
+    pass
+
+
+def test_stats():
+    ctl = getattr(InstrumentedList, CONTROL_ATTR)
+    ctl.reset_stats()
+    obj = InstrumentedList(l.lr(3))
+    obj.append('d')
+    obj[1]
+    obj[:2]
+    del obj[0:2]
+
+    with pytest.raises(ValueError):
+        obj.extend(['e', 'X'])
+
+    stats = ctl.stats()
+
+    assert stats['hooks']['set']['count'] == 6
+    assert stats['hooks']['get']['count'] == 3
+    assert sum(stats['hooks']['set']['buckets']) == 6
+    assert {
+        name: histogram['count'] for name, histogram in stats['operations'].items()
+    } == {
+        '__init__': 1, 'append': 1, '__getitem__': 2, '__delitem__': 1, 'extend': 1
+    }
+    assert stats['rollbacks'] == 1
+    assert stats['journal_bytes'] > 0
+
+    ctl.reset_stats()
+    stats = ctl.stats()
+    assert stats['hooks'] == {}
+    assert stats['operations'] == {}
+    assert stats['journal_bytes'] == 0
+    assert stats['rollbacks'] == 0
+
+
+def test_subclasses_have_their_own_stats():
+    InstrumentedSubList(l.lr(2)).append('c')
+    stats = getattr(InstrumentedSubList, CONTROL_ATTR).stats()
+    assert stats['operations']['append']['count'] == 1
+    assert stats['hooks']['set']['count'] == 3
+
+
+def test_not_instrumented():
+    ctl = getattr(PluggableList, CONTROL_ATTR)
+    PluggableList(l.lr(3)).append('d')
+    assert ctl.stats() is None
+    assert ctl.get_stats() is None
+
+
+class UninstrumentedSubList(InstrumentedList, instrument=False):
+    pass
+
+
+def test_inherited_callbacks_are_timed_once():
+    parent_ctl = getattr(InstrumentedList, CONTROL_ATTR)
+    ctl = getattr(InstrumentedSubList, CONTROL_ATTR)
+    parent_ctl.reset_stats()
+    ctl.reset_stats()
+
+    InstrumentedSubList(l.lr(2))
+    UninstrumentedSubList(l.lr(2))
+
+    assert ctl.stats()['hooks']['set']['count'] == 2
+    assert parent_ctl.stats()['hooks'] == {}
+    assert ctl.get_callback(Hook.set).__wrapped__.__name__ == 'set_cb'
+    assert not hasattr(ctl.get_callback(Hook.set).__wrapped__, '__wrapped__')
+
+
+class OverridingList(InstrumentedList):
+    def append(self, value):
+        super().append(value)
+
+
+def test_only_outermost_operations_are_recorded():
+    """
+    Test operations that call other operations on the same list, or the
+    method they override, are recorded once.
+    """
+    ctl = getattr(OverridingList, CONTROL_ATTR)
+    obj = OverridingList(l.lr(2))
+    ctl.reset_stats()
+    obj.append('c')
+    obj.copy()
+    list(obj)
+
+    assert {
+        name: histogram['count']
+        for name, histogram in ctl.stats()['operations'].items()
+    } == {'append': 1, 'copy': 1, '__iter__': 1}
@@ -0,0 +1,109 @@
+"""
+Test iterators that fetch elements in chunks.
+"""
+
+import pytest
+from pluggable_list import (
+    get_callback, begin_operation_callback
+)
+from pluggable_list.bases import PluggableList
+from pluggable_list.exceptions import ModifiedDuringIteration
+
+
+l = pytest.pluggable_list
+
+
+class CountingList(PluggableList):
+    """
+    A pluggable list that upper cases fetched values and records the
+    indices of fetched values and the number of operations begun on it.
+    """
+    def __init__(self, *args, **kwargs):
+        self.fetched = []
+        self.begun = 0
+        super().__init__(*args, **kwargs)
+
+    @get_callback()
+    def get_cb(self, hook, proxy, idx, value):
+        self.fetched.append(idx)
+        return value.upper()
+
+    @begin_operation_callback()
+    def begin_cb(self, hook, proxy, **kwargs):
+        self.begun += 1
+
+
+class ChunkedList(CountingList, iter_chunk_size=3):
+    pass
+
+
+class UnchunkedList(CountingList, iter_chunk_size=None):
+    pass
+
+
+@pytest.mark.parametrize(
+    "cls,ops",
+    [
+        (CountingList, 11),
+        (ChunkedList, 4),
+        (UnchunkedList, 1),
+    ]
+)
+def test_iter(cls, ops):
+    """
+    Test iteration fetches every element in the expected number of
+    operations.
+    """
+    obj = cls(l.lr(10))
+    obj.begun = 0
+
+    assert list(obj) == [v.upper() for v in l.lr(10)]
+    assert obj.fetched == list(range(10))
+    assert obj.begun == ops
+
+
+def test_iter_chunk_size_is_inherited():
+    class ChildList(ChunkedList):
+        pass
+
+    obj = ChildList(l.lr(10))
+    obj.begun = 0
+    list(obj)
+    assert obj.begun == 4
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('append', ('k',)),
+        ('__delitem__', (0,)),
+        ('__setitem__', (8, 'z')),
+        ('clear', ()),
+    ]
+)
+def test_modified_during_iteration(func_name, args):
+    """
+    Test chunked iterators raise an exception if the list is modified.
+    """
+    obj = ChunkedList(l.lr(10))
+    iter_obj = iter(obj)
+    next(iter_obj)
+
+    getattr(obj, func_name)(*args)
+
+    with pytest.raises(ModifiedDuringIteration):
+        list(iter_obj)
+
+
+def test_failed_modification_during_iteration():
+    """
+    Test a modification that is reverted does not stop iteration.
+    """
+    obj = ChunkedList(l.lr(10))
+    iter_obj = iter(obj)
+    next(iter_obj)
+
+    with pytest.raises(IndexError):
+        obj.pop(20)
+
+    assert len(list(iter_obj)) == 9
@@ -0,0 +1,114 @@
+"""
+Test thread safe lists and the locks they use.
+"""
+
+import threading
+import time
+import pytest
+from pluggable_list import set_callback
+from pluggable_list.bases import PluggableList
+from pluggable_list.locks import ReadWriteLock
+
+
+class SafeList(PluggableList, thread_safe=True):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            time.sleep(0.001)
+            raise ValueError()
+        return value
+
+
+def test_shared_readers():
+    lock = ReadWriteLock()
+    release = lock.acquire_read()
+    acquired = []
+
+    thread = threading.Thread(target=lambda: acquired.append(lock.acquire_read()))
+    thread.start()
+    thread.join(5)
+
+    assert len(acquired) == 1
+    release()
+
+
+def test_exclusive_writer():
+    lock = ReadWriteLock()
+    release = lock.acquire_read()
+    acquired = threading.Event()
+
+    def write():
+        lock.acquire_write()()
+        acquired.set()
+
+    thread = threading.Thread(target=write)
+    thread.start()
+
+    assert not acquired.wait(0.1)
+    release()
+    assert acquired.wait(5)
+    thread.join(5)
+
+
+def test_reentrant():
+    lock = ReadWriteLock()
+    releases = [lock.acquire_write(), lock.acquire_read(), lock.acquire_write()]
+
+    for release in reversed(releases):
+        release()
+
+    release = lock.acquire_read()
+    lock.acquire_read()()
+
+    with pytest.raises(RuntimeError):
+        lock.acquire_write()
+
+    release()
+    lock.acquire_write()()
+
+
+def test_thread_safe_list():
+    """
+    Test readers never see the changes of a modifying operation part way
+    through or before they are reverted.
+    """
+    obj = SafeList()
+    errors = []
+    stop = threading.Event()
+
+    def write(n):
+        for i in range(200):
+            with obj.transaction():
+                obj.append(n)
+                obj.append(n)
+            try:
+                with obj.transaction():
+                    obj.append(n)
+                    obj.append('X')
+            except ValueError:
+                pass
+            if i % 10 == 0:
+                del obj[:4]
+
+    def read():
+        while not stop.is_set():
+            values = obj[:]
+            if len(values) % 2 or 'X' in values or values[::2] != values[1::2]:
+                errors.append(values)
+            for value in obj:
+                if value == 'X':
+                    errors.append(value)
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    readers = [threading.Thread(target=read) for _ in range(4)]
+
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert len(obj[:]) % 2 == 0
@@ -0,0 +1,46 @@
+"""
+Test the allocation profiling harness.
+"""
+
+import json
+from pluggable_list import bench, memprofile
+
+
+def test_profile():
+    list_cls = bench.make_list_class(('set', 'get'))
+    result = memprofile.profile(list_cls, 'append', 100, top=3)
+
+    assert result['peak'] > 0
+    assert result['retained'] > 0
+    assert 0 < len(result['sites']) <= 3
+    assert all(not site.startswith('memprofile.py') for site, _ in result['sites'])
+
+
+def test_run():
+    results = memprofile.run(
+        sizes=[10], hooks=['none', 'set'], benchmarks=['extend', 'init']
+    )
+
+    assert [(r['benchmark'], r['hooks']) for r in results] == [
+        ('extend', 'none'), ('init', 'none'), ('extend', 'set'), ('init', 'set'),
+    ]
+    assert all(r['peak_per_element'] == r['peak'] / 10 for r in results)
+
+
+def test_main_saves_and_compares(tmpdir):
+    path = str(tmpdir.join('baseline.json'))
+    args = ['--sizes', '10', '--hooks', 'none', '--benchmarks', 'extend']
+
+    assert memprofile.main(args + ['--save', path]) == 0
+
+    with open(path) as baseline_file:
+        results = json.load(baseline_file)['results']
+
+    assert memprofile.main(args + ['--compare', path]) == 0
+
+    for result in results:
+        result['peak'] = 1
+    with open(path, 'w') as baseline_file:
+        json.dump({'results': results}, baseline_file)
+
+    assert memprofile.main(args + ['--compare', path]) == 1
@@ -0,0 +1,172 @@
+"""
+Test pickling and copying pluggable lists.
+"""
+
+import array
+import asyncio
+import copy
+import pickle
+import pytest
+from pluggable_list import ArrayStorage, set_callback
+from pluggable_list.asynchronous import AsyncPluggableList
+from pluggable_list.bases import PluggableList, SortedPluggableList
+
+
+l = pytest.pluggable_list
+
+
+class CountingList(PluggableList):
+    __slots__ = ('name', '__secret')
+
+    sets = 0
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        type(self).sets += 1
+        return value.upper()
+
+    @property
+    def secret(self):
+        return self.__secret
+
+    @secret.setter
+    def secret(self, value):
+        self.__secret = value
+
+
+class DictList(PluggableList):
+    pass
+
+
+class SafeList(PluggableList, thread_safe=True, snapshot_reads=True):
+    pass
+
+
+class IntList(PluggableList, storage=ArrayStorage('l')):
+    pass
+
+
+class CountingAsyncList(AsyncPluggableList):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        return value * 2
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_skips_set_callbacks(protocol):
+    obj = CountingList(l.lr(5))
+    obj.name = 'name'
+    obj.secret = 'secret'
+    sets = CountingList.sets
+
+    restored = pickle.loads(pickle.dumps(obj, protocol))
+
+    assert CountingList.sets == sets
+    assert type(restored) is CountingList
+    assert restored[:] == ['A', 'B', 'C', 'D', 'E']
+    assert restored.name == 'name'
+    assert restored.secret == 'secret'
+
+    restored.append('f')
+    assert restored[-1] == 'F'
+    assert obj[:] == ['A', 'B', 'C', 'D', 'E']
+
+
+def test_pickle_unset_slot():
+    restored = pickle.loads(pickle.dumps(CountingList(l.lr(2))))
+
+    assert not hasattr(restored, 'name')
+
+
+def test_pickle_dict_attrs():
+    obj = DictList(l.lr(3))
+    obj.name = 'name'
+
+    restored = pickle.loads(pickle.dumps(obj))
+
+    assert restored[:] == l.lr(3)
+    assert vars(restored) == {'name': 'name'}
+
+
+def test_pickle_thread_safe_list():
+    obj = SafeList(l.lr(3))
+
+    restored = pickle.loads(pickle.dumps(obj))
+    restored.append('d')
+
+    assert restored[:] == l.lr(4)
+    assert obj[:] == l.lr(3)
+
+
+def test_pickle_sorted_list():
+    restored = pickle.loads(pickle.dumps(SortedPluggableList('dbca')))
+    restored.add('b')
+
+    assert restored[:] == ['a', 'b', 'b', 'c', 'd']
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_array_storage(protocol):
+    obj = IntList(range(10))
+
+    restored = pickle.loads(pickle.dumps(obj, protocol))
+    restored.append(10)
+
+    assert restored[:] == list(range(11))
+    assert obj[:] == list(range(10))
+
+
+@pytest.mark.skipif(not hasattr(pickle, 'PickleBuffer'), reason='requires protocol 5')
+def test_pickle_array_storage_out_of_band():
+    obj = IntList(range(1000))
+    buffers = []
+
+    dumped = pickle.dumps(obj, 5, buffer_callback=buffers.append)
+
+    assert len(buffers) == 1
+    assert len(dumped) < 1000
+    assert buffers[0].raw().nbytes == 1000 * array.array('l').itemsize
+
+    obj.append(1000)
+    obj.extend(range(1001, 1010))
+    del obj[:10]
+    restored = pickle.loads(dumped, buffers=buffers)
+    restored.append(1000)
+
+    assert restored[:] == list(range(1001))
+    assert obj[:] == list(range(10, 1010))
+
+
+def test_copy():
+    obj = CountingList(l.lr(3))
+    sets = CountingList.sets
+
+    for copied in (obj.copy(), copy.copy(obj)):
+        copied.append('d')
+
+        assert CountingList.sets == sets + 1
+        assert copied[:] == ['A', 'B', 'C', 'D']
+        assert obj[:] == ['A', 'B', 'C']
+        sets += 1
+
+
+def test_deepcopy():
+    obj = DictList([[1], [2]])
+    copied = copy.deepcopy(obj)
+    copied[0].append(3)
+
+    assert obj[:] == [[1], [2]]
+    assert copied[:] == [[1, 3], [2]]
+
+
+def test_pickle_async_list():
+    obj = CountingAsyncList()
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(obj.extend([1, 2]))
+        restored = pickle.loads(pickle.dumps(obj))
+
+        assert loop.run_until_complete(restored.get(slice(None))) == [2, 4]
+    finally:
+        loop.close()
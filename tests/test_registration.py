@@ -39,3 +39,8 @@ def test_hook_already_registered():
     except Exception as exp:
         assert exp.__class__ == HookAlreadyRegistered
         assert exp.hook == Hook.set
+
+
+def test_unknown_option():
+    with pytest.raises(TypeError):
+        type(BasePluggableList)('testcls', (BasePluggableList,), {}, colour='red')
@@ -0,0 +1,155 @@
+"""
+Test the shared memory storage backend.
+"""
+
+import array
+import multiprocessing
+import pickle
+import threading
+import pytest
+from pluggable_list import set_callback
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import DATA_ATTR
+from pluggable_list.exceptions import StorageFull
+
+
+shared = pytest.importorskip('pluggable_list.shared')
+l = pytest.pluggable_list
+
+
+class SharedIntList(PluggableList, storage=shared.SharedMemoryStorage('l', 16)):
+    pass
+
+
+class DoublingSharedIntList(SharedIntList):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        return value * 2
+
+
+def extend_attached(name, values):
+    obj = shared.attach(DoublingSharedIntList, name)
+    obj.extend(values)
+    shared.detach(obj)
+
+
+def hold_transaction(name, started, finish):
+    obj = shared.attach(SharedIntList, name)
+    with obj.transaction():
+        obj.append(-1)
+        started.set()
+        finish.wait(5)
+        del obj[-1]
+    shared.detach(obj)
+
+
+@pytest.fixture
+def shared_list():
+    obj = SharedIntList(range(10))
+    yield obj
+    shared.detach(obj, unlink=True)
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('__getitem__', (-3,)),
+        ('__getitem__', (slice(2, None, 3),)),
+        ('__setitem__', (2, 100)),
+        ('__setitem__', (slice(1, 4), [7, 8])),
+        ('__setitem__', (slice(1, 4), range(6))),
+        ('__setitem__', (slice(None, None, 2), [1, 2, 3, 4, 5])),
+        ('__delitem__', (4,)),
+        ('__delitem__', (slice(1, None, 3),)),
+        ('append', (11,)),
+        ('extend', (range(5),)),
+        ('insert', (-2, 12)),
+        ('pop', (3,)),
+        ('remove', (5,)),
+        ('index', (7,)),
+        ('count', (7,)),
+        ('clear', ()),
+        ('reverse', ()),
+        ('sort', ()),
+    ]
+)
+def test_shared_storage(func_name, args):
+    """
+    Test a list using shared memory storage behaves as a list.
+    """
+    rig = l.function_test_rig(SharedIntList, [3, 1, 4, 1, 5, 9, 2, 6, 5, 7])
+    try:
+        rig.assert_equiv(func_name, *args)
+    finally:
+        shared.detach(rig.obj, unlink=True)
+
+
+def test_shared_storage_is_full(shared_list):
+    with pytest.raises(StorageFull):
+        shared_list.extend(range(10))
+
+    with pytest.raises(TypeError):
+        shared_list.extend([5, 'a'])
+
+    assert shared_list[:] == list(range(10))
+
+
+def test_attach_in_another_process(shared_list):
+    process = multiprocessing.get_context('fork').Process(
+        target=extend_attached, args=(shared.shared_name(shared_list), [1, 2])
+    )
+    process.start()
+    process.join(10)
+
+    assert process.exitcode == 0
+    assert shared_list[:] == list(range(10)) + [2, 4]
+    assert isinstance(getattr(shared_list, DATA_ATTR)[:], array.array)
+
+
+def test_operations_exclude_other_processes(shared_list):
+    context = multiprocessing.get_context('fork')
+    started = context.Event()
+    finish = context.Event()
+    process = context.Process(
+        target=hold_transaction,
+        args=(shared.shared_name(shared_list), started, finish)
+    )
+    process.start()
+
+    appended = threading.Event()
+
+    def append():
+        shared_list.append(99)
+        appended.set()
+
+    thread = threading.Thread(target=append)
+
+    try:
+        assert started.wait(5)
+        thread.start()
+        assert not appended.wait(0.2)
+    finally:
+        finish.set()
+        process.join(10)
+        thread.join(10)
+
+    assert process.exitcode == 0
+    assert shared_list[:] == list(range(10)) + [99]
+
+
+def test_pickle_copies_into_new_block(shared_list):
+    restored = pickle.loads(pickle.dumps(shared_list))
+    try:
+        restored.append(10)
+
+        assert shared.shared_name(restored) != shared.shared_name(shared_list)
+        assert restored[:] == list(range(11))
+        assert shared_list[:] == list(range(10))
+    finally:
+        shared.detach(restored, unlink=True)
+
+
+def test_per_process_options_are_refused():
+    for option in ('get_cache_size', 'index_values', 'snapshot_reads'):
+        with pytest.raises(ValueError):
+            type(SharedIntList)('BadList', (SharedIntList,), {}, **{option: 4})
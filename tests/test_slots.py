@@ -0,0 +1,78 @@
+"""
+Test pluggable list instances hold their state in slots.
+"""
+
+import weakref
+import pytest
+from pluggable_list import memprofile, set_callback
+from pluggable_list.asynchronous import AsyncPluggableList
+from pluggable_list.bases import PluggableList, SortedPluggableList
+
+
+l = pytest.pluggable_list
+
+
+class SlotList(PluggableList):
+    __slots__ = ()
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        return value
+
+
+class DictList(PluggableList):
+    pass
+
+
+class SafeSlotList(PluggableList, thread_safe=True, get_cache_size=4):
+    __slots__ = ()
+
+
+@pytest.mark.parametrize(
+    "list_cls", [PluggableList, SortedPluggableList, SlotList, AsyncPluggableList]
+)
+def test_no_dict(list_cls):
+    assert not hasattr(list_cls(), '__dict__')
+
+
+def test_subclass_without_slots_has_dict():
+    obj = DictList(l.lr(3))
+    obj.name = 'name'
+
+    assert vars(obj) == {'name': 'name'}
+    assert obj[:] == l.lr(3)
+
+
+def test_weakref():
+    obj = SlotList(l.lr(3))
+    ref = weakref.ref(obj)
+
+    assert ref() is obj
+
+
+def test_state_in_slots():
+    obj = SafeSlotList(l.lr(5))
+    obj[1] = 'x'
+    obj.append('y')
+
+    assert obj[1] == 'x'
+    assert obj[:] == ['a', 'x', 'c', 'd', 'e', 'y']
+
+    with obj.transaction():
+        obj.append('z')
+
+    assert obj[:] == ['a', 'x', 'c', 'd', 'e', 'y', 'z']
+
+
+def test_iterators_have_no_dict():
+    obj = SlotList(l.lr(3))
+
+    assert not hasattr(iter(obj), '__dict__')
+
+
+def test_instance_sizes():
+    sizes = memprofile.instance_sizes(1000)
+
+    assert list(sizes) == ['list', 'slots', 'dict']
+    assert sizes['list'] < sizes['slots'] < sizes['dict']
+    assert memprofile.main(['--instances', '100', '--sizes', '3']) == 0
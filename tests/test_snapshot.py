@@ -0,0 +1,228 @@
+"""
+Test lists that publish snapshots for lock free reads.
+"""
+
+import threading
+import time
+import pytest
+from pluggable_list import (
+    get_callback, set_callback, search_key_callback,
+    begin_operation_callback, end_operation_callback
+)
+from pluggable_list.bases import PluggableList, SortedPluggableList
+
+
+l = pytest.pluggable_list
+
+
+class SnapshotList(PluggableList, snapshot_reads=True):
+    """
+    A pluggable list that publishes snapshots, refuses the value 'X' and
+    records the operations begun and ended.
+    """
+    def __init__(self, *args, **kwargs):
+        self.ops = []
+        super().__init__(*args, **kwargs)
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            raise ValueError()
+        return value
+
+    @get_callback()
+    def get_cb(self, hook, proxy, idx, value):
+        return value.upper()
+
+    @search_key_callback()
+    def search_key_cb(self, hook, proxy, value):
+        return value.lower()
+
+    @begin_operation_callback()
+    def begin_cb(self, hook, proxy, **kwargs):
+        self.ops.append('begin')
+
+    @end_operation_callback()
+    def end_cb(self, hook, proxy):
+        self.ops.append('end')
+
+
+class SafeSnapshotList(PluggableList, thread_safe=True, snapshot_reads=True):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        if value == 'X':
+            time.sleep(0.001)
+            raise ValueError()
+        return value
+
+
+class SortedSnapshotList(SortedPluggableList, snapshot_reads=True):
+    pass
+
+
+def test_snapshot_reads():
+    obj = SnapshotList(l.lr(5))
+    obj.append('f')
+    obj[1:3] = ['x', 'y', 'z']
+    del obj[0]
+    obj.ops = []
+    real_list = [v.upper() for v in ['x', 'y', 'z'] + l.lr(3, 6)]
+
+    assert obj[:] == real_list
+    assert obj[1:5:2] == real_list[1:5:2]
+    assert obj[-1] == real_list[-1]
+    assert list(obj) == real_list
+    assert 'Y' in obj
+    assert 'k' not in obj
+    assert obj.ops == []
+
+
+def test_snapshot_not_published_until_commit():
+    obj = SnapshotList(l.lr(3))
+    seen = []
+
+    def read():
+        seen.append((obj[:], list(obj), 'k' in obj))
+
+    with obj.transaction():
+        obj.append('k')
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        assert obj[:] == [v.upper() for v in l.lr(3)] + ['K']
+        assert 'k' in obj
+
+    committed = [v.upper() for v in l.lr(3)]
+    assert seen == [(committed, committed, False)]
+    assert obj[:] == committed + ['K']
+
+
+def test_failed_operation_keeps_snapshot():
+    obj = SnapshotList(l.lr(3))
+
+    with pytest.raises(ValueError):
+        obj.extend(['k', 'X'])
+
+    with pytest.raises(ValueError):
+        with obj.transaction():
+            obj.clear()
+            obj.append('X')
+
+    assert obj[:] == [v.upper() for v in l.lr(3)]
+
+
+def test_sorted_snapshot_contains():
+    obj = SortedSnapshotList([5, 1, 3])
+    obj.add(2)
+    assert 2 in obj
+    assert 4 not in obj
+    assert obj[:] == [1, 2, 3, 5]
+
+
+def test_reads_do_not_wait_for_writers():
+    obj = SafeSnapshotList(l.lr(3))
+    started = threading.Event()
+    finish = threading.Event()
+
+    def write():
+        with obj.transaction():
+            obj.append('k')
+            started.set()
+            finish.wait(5)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    assert started.wait(5)
+
+    try:
+        assert obj[:] == l.lr(3)
+        assert list(obj) == l.lr(3)
+        assert 'k' not in obj
+    finally:
+        finish.set()
+        thread.join()
+
+    assert obj[:] == l.lr(3) + ['k']
+
+
+def test_snapshot_writers_run_one_at_a_time():
+    """
+    Test a modifying operation waits for one in progress in another thread
+    when the class publishes snapshots but is not declared thread safe.
+    """
+    obj = SortedSnapshotList()
+    started = threading.Event()
+    finish = threading.Event()
+    added = threading.Event()
+
+    def first():
+        with obj.transaction():
+            obj.add(2)
+            started.set()
+            finish.wait(5)
+            obj.add(3)
+
+    def second():
+        obj.add(1)
+        added.set()
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    threads[0].start()
+    assert started.wait(5)
+    threads[1].start()
+
+    try:
+        assert not added.wait(0.05)
+        assert list(obj) == []
+    finally:
+        finish.set()
+        for thread in threads:
+            thread.join()
+
+    assert list(obj) == [1, 2, 3]
+
+
+def test_snapshot_reads_are_consistent():
+    """
+    Test readers never see the changes of a modifying operation part way
+    through or before they are reverted.
+    """
+    obj = SafeSnapshotList()
+    errors = []
+    stop = threading.Event()
+
+    def write(n):
+        for i in range(50):
+            with obj.transaction():
+                obj.append(n)
+                obj.append(n)
+            try:
+                with obj.transaction():
+                    obj.append(n)
+                    obj.append('X')
+            except ValueError:
+                pass
+            if i % 10 == 0:
+                del obj[:4]
+
+    def read():
+        while not stop.is_set():
+            values = obj[:]
+            if len(values) % 2 or 'X' in values or values[::2] != values[1::2]:
+                errors.append(values)
+            if 'X' in obj or 'X' in list(obj):
+                errors.append('X')
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    readers = [threading.Thread(target=read) for _ in range(4)]
+
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert len(obj[:]) % 2 == 0
@@ -1,5 +1,9 @@
 import pytest
-from pluggable_list.bases import ReverseMixin
+from pluggable_list import (
+    ArrayStorage, sort_callback, sort_many_callback, revert_callback
+)
+from pluggable_list.bases import PluggableList, ReverseMixin
+from pluggable_list.constants import DATA_ATTR
 
 
 l = pytest.pluggable_list
@@ -17,3 +21,100 @@ def test_reverse(reversable_list, value_seq):
     """
     rig = l.function_test_rig(reversable_list(), value_seq)
     rig.assert_equiv('reverse')
+
+
+class LengthSortedList(PluggableList):
+    """
+    A pluggable list that sorts values by their length and records the
+    values passed to its sort callback and the number of reverts.
+    """
+    def __init__(self, *args, **kwargs):
+        self.sorted_values = []
+        self.reverted = 0
+        super().__init__(*args, **kwargs)
+
+    @sort_callback()
+    def sort_cb(self, hook, proxy, value):
+        self.sorted_values.append(value)
+        return len(value)
+
+    @revert_callback()
+    def revert_cb(self, hook, proxy):
+        self.reverted += 1
+
+
+class BatchLengthSortedList(PluggableList):
+    def __init__(self, *args, **kwargs):
+        self.sorted_values = []
+        super().__init__(*args, **kwargs)
+
+    @sort_many_callback()
+    def sort_many_cb(self, hook, proxy, indices, values):
+        self.sorted_values.extend(values)
+        return [len(value) for value in values]
+
+
+class IntList(PluggableList, storage=ArrayStorage('l')):
+    pass
+
+
+def elements():
+    return ['ccc', 'a', 'bb', 'dddd', 'e', 'ff']
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {'reverse': True}, {'key': lambda v: v[-1]}, {'key': len, 'reverse': True}]
+)
+def test_sort(kwargs):
+    rig = l.function_test_rig(PluggableList, elements())
+    rig.assert_equiv('sort', **kwargs)
+
+
+def test_array_storage_sort():
+    rig = l.function_test_rig(IntList, [3, -1, 7, 0, 2])
+    rig.assert_equiv('sort', reverse=True)
+
+
+@pytest.mark.parametrize("cls", [LengthSortedList, BatchLengthSortedList])
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        ({}, ['a', 'e', 'bb', 'ff', 'ccc', 'dddd']),
+        ({'reverse': True}, ['dddd', 'ccc', 'bb', 'ff', 'a', 'e']),
+        ({'key': lambda n: -n}, ['dddd', 'ccc', 'bb', 'ff', 'a', 'e']),
+    ]
+)
+def test_sort_callback(cls, kwargs, expected):
+    """
+    Test the sort callback is invoked once per element, the values it
+    returns are passed to the key function and the sort is stable.
+    """
+    obj = cls(elements())
+    obj.sort(**kwargs)
+
+    assert getattr(obj, DATA_ATTR) == expected
+    assert sorted(obj.sorted_values) == sorted(elements())
+
+
+def test_failed_sort_is_reverted():
+    obj = LengthSortedList(elements())
+
+    with pytest.raises(ZeroDivisionError):
+        obj.sort(key=lambda n: 1 / (n - 2))
+
+    assert getattr(obj, DATA_ATTR) == elements()
+    assert obj.reverted == 1
+
+
+def test_sort_is_reverted_with_transaction():
+    obj = LengthSortedList(elements())
+    version = obj.version()
+
+    with pytest.raises(KeyError):
+        with obj.transaction():
+            obj.sort()
+            raise KeyError()
+
+    assert getattr(obj, DATA_ATTR) == elements()
+    assert obj.version() == version
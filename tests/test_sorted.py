@@ -0,0 +1,146 @@
+"""
+Test sorted pluggable lists.
+"""
+
+import pytest
+from pluggable_list import (
+    SortedPluggableList, ArrayStorage, set_callback, remove_callback,
+    sort_callback, sort_many_callback
+)
+from pluggable_list.constants import DATA_ATTR
+
+
+class RecordingSortedList(SortedPluggableList):
+    """
+    A sorted pluggable list that records the indices and values passed to
+    its set and remove callbacks.
+    """
+    def __init__(self, *args, **kwargs):
+        self.set_calls = []
+        self.remove_calls = []
+        super().__init__(*args, **kwargs)
+
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        self.set_calls.append((idx, value))
+        return value
+
+    @remove_callback()
+    def remove_cb(self, hook, proxy, idx, value):
+        self.remove_calls.append((idx, value))
+        return value
+
+
+class LengthSortedList(SortedPluggableList):
+    @sort_callback()
+    def sort_cb(self, hook, proxy, value):
+        return len(value)
+
+
+class SortedIntList(SortedPluggableList, storage=ArrayStorage('l')):
+    pass
+
+
+def elements():
+    return [5, 1, 4, 1, 3, 9, 2, 6, 5]
+
+
+@pytest.mark.parametrize("cls", [SortedPluggableList, SortedIntList])
+def test_sorted(cls):
+    obj = cls(elements())
+    real_list = sorted(elements())
+
+    for value in [0, 5, 7, 10, 1]:
+        obj.add(value)
+        real_list.append(value)
+        real_list.sort()
+        assert list(obj) == real_list
+
+    obj.update([8, 2, 2])
+    real_list = sorted(real_list + [8, 2, 2])
+    assert list(obj) == real_list
+
+    for value in range(-1, 12):
+        assert (value in obj) == (value in real_list)
+        assert obj.count(value) == real_list.count(value)
+        if value in real_list:
+            assert obj.index(value) == real_list.index(value)
+
+    obj.remove(5)
+    real_list.remove(5)
+    assert list(obj) == real_list
+    assert obj.pop() == real_list.pop()
+    del obj[2:5]
+    del real_list[2:5]
+    assert list(obj) == real_list
+
+    with pytest.raises(ValueError):
+        obj.remove(11)
+
+
+def test_sorted_callback_indices():
+    """
+    Test set and remove callbacks are invoked with the indices values are
+    inserted at and removed from.
+    """
+    obj = RecordingSortedList([3, 1, 2])
+    assert obj.set_calls == [(0, 1), (1, 2), (2, 3)]
+
+    obj.add(2)
+    obj.add(0)
+    obj.remove(2)
+    assert obj.set_calls[3:] == [(2, 2), (0, 0)]
+    assert obj.remove_calls == [(2, 2)]
+    assert getattr(obj, DATA_ATTR) == [0, 1, 2, 3]
+
+
+def test_sorted_by_sort_callback():
+    obj = LengthSortedList(['ccc', 'a', 'bb'])
+    obj.add('dd')
+    obj.add('')
+
+    assert list(obj) == ['', 'a', 'bb', 'dd', 'ccc']
+    assert obj.index('dd') == 3
+    assert obj.count('ee') == 0
+    assert 'bb' in obj
+
+
+def test_failed_update_is_reverted():
+    obj = SortedIntList([1, 3])
+
+    with pytest.raises(TypeError):
+        obj.update([2, 'a'])
+
+    assert list(obj) == [1, 3]
+
+
+class LengthManySortedList(SortedPluggableList):
+    @sort_many_callback()
+    def sort_many_cb(self, hook, proxy, indices, values):
+        return [len(value) for value in values]
+
+
+def test_sorted_by_sort_many_callback():
+    """
+    Test a sort many callback orders a sorted list as it orders a sort.
+    """
+    obj = LengthManySortedList(['ccc', 'a', 'bb'])
+    obj.add('dd')
+    obj.update(['', 'eee', 'f'])
+
+    assert list(obj) == ['', 'a', 'f', 'bb', 'dd', 'ccc', 'eee']
+    assert obj.index('dd') == 4
+    assert 'f' in obj
+
+
+def test_update_merges_values():
+    """
+    Test update on a non-empty list inserts the values after equal elements
+    and invokes the set callback with the indices they end up at.
+    """
+    obj = RecordingSortedList([1, 3, 5])
+    obj.set_calls.clear()
+    obj.update([4, 0, 3, 6, 3])
+
+    assert getattr(obj, DATA_ATTR) == [0, 1, 3, 3, 3, 4, 5, 6]
+    assert obj.set_calls == [(0, 0), (3, 3), (4, 3), (5, 4), (7, 6)]
@@ -0,0 +1,86 @@
+"""
+Test storage backends.
+"""
+
+import array
+import pytest
+from pluggable_list import ArrayStorage, ListStorage, set_callback
+from pluggable_list.bases import PluggableList
+from pluggable_list.constants import CONTROL_ATTR, DATA_ATTR
+from pluggable_list.storage import Storage
+
+
+l = pytest.pluggable_list
+
+
+class IntList(PluggableList, storage=ArrayStorage('l')):
+    pass
+
+
+class DoublingIntList(IntList):
+    @set_callback()
+    def set_cb(self, hook, proxy, idx, value):
+        return value * 2
+
+
+def test_default_storage():
+    assert isinstance(getattr(PluggableList, CONTROL_ATTR).get_storage(), ListStorage)
+    assert isinstance(getattr(PluggableList(), DATA_ATTR), list)
+
+
+def test_storage_is_inherited():
+    assert (
+        getattr(DoublingIntList, CONTROL_ATTR).get_storage() is
+        getattr(IntList, CONTROL_ATTR).get_storage()
+    )
+    assert getattr(DoublingIntList(range(3)), DATA_ATTR) == array.array('l', [0, 2, 4])
+
+
+@pytest.mark.parametrize(
+    "func_name,args",
+    [
+        ('__getitem__', (3,)),
+        ('__getitem__', (slice(2, None, 3),)),
+        ('__setitem__', (2, 100)),
+        ('__setitem__', (slice(1, 4), [7, 8])),
+        ('__setitem__', (slice(None, None, 2), [1, 2, 3, 4, 5])),
+        ('__delitem__', (4,)),
+        ('__delitem__', (slice(1, None, 3),)),
+        ('append', (11,)),
+        ('extend', (range(5),)),
+        ('insert', (-2, 12)),
+        ('clear', ()),
+        ('reverse', ()),
+    ]
+)
+def test_array_storage(func_name, args):
+    """
+    Test a list using array storage behaves as a list.
+    """
+    rig = l.function_test_rig(IntList, range(10))
+    rig.assert_equiv(func_name, *args)
+    assert isinstance(getattr(rig.obj, DATA_ATTR), array.array)
+
+
+def test_array_storage_reverts_bad_values():
+    obj = IntList(range(5))
+
+    with pytest.raises(TypeError):
+        obj.extend([5, 6, 'a'])
+
+    assert getattr(obj, DATA_ATTR) == array.array('l', range(5))
+
+
+def test_array_storage_sort():
+    data = array.array('d', [3.0, 1.0, 2.0])
+    ArrayStorage('d').sort(data, reverse=True)
+    assert data == array.array('d', [3.0, 2.0, 1.0])
+
+
+def test_incomplete_storage_cannot_be_created():
+    class IncompleteStorage(Storage):
+        def create(self, values=()):
+            return list(values)
+
+    with pytest.raises(TypeError):
+        IncompleteStorage()